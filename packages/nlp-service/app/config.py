@@ -28,6 +28,7 @@ class Settings(BaseSettings):
     ollama_model: str = "mistral:latest"
     ollama_timeout: int = 120
     ollama_max_retries: int = 3
+    ollama_max_concurrency: int = 2
     
     # LLM Parameters
     llm_temperature: float = 0.7
@@ -48,6 +49,7 @@ class Settings(BaseSettings):
     chunk_overlap_words: int = 200
     min_chunk_words: int = 200
     max_chunk_words: int = 1200
+    chunk_use_spacy: bool = False
     
     # Quality Thresholds
     min_quality_score: float = 0.4
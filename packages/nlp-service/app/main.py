@@ -13,6 +13,7 @@ from app.config import settings
 from app.utils.logger import logger
 from app.utils.errors import NLPServiceError
 from app.utils.cache import get_cache
+from app.services.text_chunker import load_nlp
 from app.routers import health_router, questions_router, pdf_router
 
 
@@ -42,6 +43,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     except Exception as e:
         logger.warning(f"Failed to initialize cache: {e}")
     
+    # Load the spaCy pipeline up front so the first request doesn't pay for it
+    if settings.chunk_use_spacy:
+        load_nlp()
+    
     yield
     
     # Shutdown
@@ -4,7 +4,7 @@ Defines schemas for extraction and chunking operations
 """
 from datetime import datetime
 from typing import Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field
 
 
 class PDFMetadata(BaseModel):
@@ -94,12 +94,6 @@ class PDFExtractionRequest(BaseModel):
     model_config = {
         "populate_by_name": True,
     }
-    
-    @field_validator("file_path", "file_content", mode="after")
-    @classmethod
-    def validate_input(cls, v, info):
-        """Ensure at least one input method is provided."""
-        return v
 
 
 class PDFExtractionResponse(BaseModel):
@@ -196,6 +190,7 @@ class TextChunk(BaseModel):
     
     model_config = {
         "populate_by_name": True,
+        "frozen": True,
     }
 
 
@@ -18,6 +18,9 @@ class DifficultyLevel(str, Enum):
 class QuestionOption(BaseModel):
     """A single answer option for a multiple choice question."""
     
+    # Whitespace is stripped in pydantic-core, before the length checks
+    model_config = {"frozen": True, "str_strip_whitespace": True}
+    
     id: str = Field(
         ...,
         pattern=r"^[A-D]$",
@@ -29,12 +32,6 @@ class QuestionOption(BaseModel):
         max_length=500,
         description="Option text"
     )
-    
-    @field_validator("text")
-    @classmethod
-    def clean_text(cls, v: str) -> str:
-        """Clean and normalize option text."""
-        return v.strip()
 
 
 class GeneratedQuestion(BaseModel):
@@ -84,6 +81,7 @@ class GeneratedQuestion(BaseModel):
     
     model_config = {
         "populate_by_name": True,
+        "frozen": True,
         "json_schema_extra": {
             "example": {
                 "questionText": "What is the primary function of mitochondria in a cell?",
@@ -111,13 +109,6 @@ class GeneratedQuestion(BaseModel):
         if ids != expected_ids:
             raise ValueError(f"Options must have IDs A, B, C, D. Got: {ids}")
         return v
-    
-    @field_validator("correct_answer")
-    @classmethod
-    def validate_correct_answer(cls, v: str, info) -> str:
-        """Ensure correct answer matches one of the options."""
-        # This validator runs after options validator
-        return v
 
 
 class QuestionGenerationRequest(BaseModel):
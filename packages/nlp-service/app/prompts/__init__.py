@@ -2,9 +2,14 @@
 Prompt templates for question generation
 Provides system and user prompts for different difficulty levels
 """
+from functools import lru_cache
+
 from app.models.question import DifficultyLevel
 
 
+# Bump when prompt wording changes so cached questions from older prompts miss
+PROMPT_VERSION = "1"
+
 SYSTEM_PROMPT = """You are an expert educational content creator specializing in creating high-quality multiple choice questions (MCQs) for learning assessments.
 
 Your task is to generate clear, pedagogically sound questions that test understanding rather than mere recall.
@@ -106,15 +111,30 @@ Output Format (respond with ONLY this JSON structure):
 }
 
 
+# Templates pre-split around {count} with braces unescaped, so rendering a
+# prompt is a single join instead of a str.format parse of the whole body
+_PROMPT_PARTS = {
+    level: tuple(
+        part.replace("{{", "{").replace("}}", "}")
+        for part in template.split("{count}")
+    )
+    for level, template in DIFFICULTY_PROMPTS.items()
+}
+
+
 def get_system_prompt() -> str:
     """Get the system prompt for question generation."""
     return SYSTEM_PROMPT
 
 
+@lru_cache(maxsize=64)
 def get_user_prompt(difficulty: DifficultyLevel, count: int = 3) -> str:
     """
     Get the user prompt for a specific difficulty level.
     
+    Prompts depend only on (difficulty, count), so each combination is
+    rendered once and reused for every chunk.
+    
     Args:
         difficulty: Question difficulty level
         count: Number of questions to generate
@@ -122,8 +142,8 @@ def get_user_prompt(difficulty: DifficultyLevel, count: int = 3) -> str:
     Returns:
         Formatted user prompt
     """
-    template = DIFFICULTY_PROMPTS.get(difficulty, DIFFICULTY_PROMPTS[DifficultyLevel.MEDIUM])
-    return template.format(count=count)
+    parts = _PROMPT_PARTS.get(difficulty, _PROMPT_PARTS[DifficultyLevel.MEDIUM])
+    return str(count).join(parts)
 
 
 def get_full_prompt(
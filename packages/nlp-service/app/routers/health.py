@@ -2,19 +2,30 @@
 Health check endpoint
 Provides service health status and dependency checks
 """
-from typing import Any
-from fastapi import APIRouter, status
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+from fastapi import APIRouter, Depends, status
 from pydantic import BaseModel, Field
 
 from app.config import settings
 from app.utils.logger import logger
-from app.utils.cache import get_cache
+from app.utils.cache import RedisCache, get_cache
 from app.services.llm_client import OllamaClient
 
 
 router = APIRouter(tags=["Health"])
 
 
+# Dependency to get an Ollama client, closed once the response is sent
+async def get_llm_client() -> AsyncIterator[OllamaClient]:
+    """Get an Ollama client for dependency checks."""
+    client = OllamaClient()
+    try:
+        yield client
+    finally:
+        await client.close()
+
+
 class HealthStatus(BaseModel):
     """Health check response model."""
     
@@ -61,19 +72,25 @@ async def health_check() -> HealthStatus:
     summary="Readiness check",
     description="Returns detailed health status including dependency checks.",
 )
-async def readiness_check() -> DetailedHealthStatus:
+async def readiness_check(
+    cache: Annotated[RedisCache, Depends(get_cache)],
+    llm_client: Annotated[OllamaClient, Depends(get_llm_client)],
+) -> DetailedHealthStatus:
     """
     Readiness check endpoint.
     
     Checks all external dependencies (Redis, Ollama).
     Suitable for Kubernetes readiness probes.
+    
+    Args:
+        cache: Redis cache to probe
+        llm_client: Ollama client to probe
     """
     dependencies: dict[str, Any] = {}
     all_healthy = True
     
     # Check Redis
     try:
-        cache = get_cache()
         redis_healthy = cache.is_connected()
         dependencies["redis"] = {
             "healthy": redis_healthy,
@@ -91,9 +108,7 @@ async def readiness_check() -> DetailedHealthStatus:
     
     # Check Ollama
     try:
-        llm_client = OllamaClient()
         ollama_health = await llm_client.check_health()
-        await llm_client.close()
         
         dependencies["ollama"] = {
             "healthy": ollama_health.get("healthy", False),
@@ -4,10 +4,12 @@ Handles PDF text extraction and chunking
 """
 from typing import Annotated
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from app.config import settings
 from app.utils.logger import logger
+from app.utils.routing import ORJSONRoute
 from app.utils.errors import PDFExtractionError, OCRRequiredError, ChunkingError
 from app.models.pdf import (
     PDFExtractionResponse,
@@ -18,12 +20,23 @@ from app.services.pdf_extractor import PDFExtractor
 from app.services.text_chunker import TextChunker
 
 
-router = APIRouter(prefix="/api/v1/pdf", tags=["PDF"])
+router = APIRouter(prefix="/api/v1/pdf", tags=["PDF"], route_class=ORJSONRoute)
 
 
 # Maximum file size (50 MB)
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
+# Accepted upload content types; generic clients often send octet-stream
+ALLOWED_CONTENT_TYPES = frozenset({
+    "application/pdf",
+    "application/x-pdf",
+    "application/octet-stream",
+})
+
+# PDF signature; the spec allows it anywhere in the first 1024 bytes
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+
 
 class ChunkTextBody(BaseModel):
     """Request body for text chunking."""
@@ -106,21 +119,45 @@ async def extract_pdf(
         Extracted text and metadata
     """
     # Validate file type
-    if not file.filename or not file.filename.lower().endswith(".pdf"):
+    if (
+        not file.filename
+        or not file.filename.lower().endswith(".pdf")
+        or file.content_type not in ALLOWED_CONTENT_TYPES
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"error": {"code": "INVALID_FILE_TYPE", "message": "File must be a PDF"}},
         )
     
-    # Read file content
+    # Reject oversized uploads before reading them into memory
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={
+                "error": {
+                    "code": "FILE_TOO_LARGE",
+                    "message": f"File size exceeds {MAX_FILE_SIZE // (1024*1024)} MB limit",
+                }
+            },
+        )
+    
+    # Read file content, checking the PDF signature before the rest of the body
     try:
-        content = await file.read()
+        head = await file.read(PDF_MAGIC_WINDOW)
+        if PDF_MAGIC in head:
+            content = head + await file.read()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"error": {"code": "FILE_READ_ERROR", "message": str(e)}},
         )
     
+    if PDF_MAGIC not in head:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": {"code": "INVALID_FILE_TYPE", "message": "File must be a PDF"}},
+        )
+    
     # Check file size
     if len(content) > MAX_FILE_SIZE:
         raise HTTPException(
@@ -183,7 +220,8 @@ async def extract_pdf(
 
 @router.post(
     "/chunk",
-    response_model=ChunkingResponse,
+    response_class=ORJSONResponse,
+    responses={200: {"model": ChunkingResponse}},
     status_code=status.HTTP_200_OK,
     summary="Chunk text into segments",
     description="""
@@ -201,10 +239,13 @@ Split text into semantic chunks suitable for LLM processing.
 )
 async def chunk_text(
     body: ChunkTextBody,
-) -> ChunkingResponse:
+) -> ORJSONResponse:
     """
     Chunk text into semantic segments.
     
+    The chunker returns a validated ChunkingResponse, so it is serialized
+    directly instead of being re-validated through response_model.
+    
     Args:
         body: Chunking request parameters
         
@@ -229,7 +270,7 @@ async def chunk_text(
         
         response = chunker.chunk_text(body.text)
         
-        return response
+        return ORJSONResponse(content=response.model_dump(mode="json", by_alias=True))
         
     except ChunkingError as e:
         logger.error(f"Chunking error: {e}")
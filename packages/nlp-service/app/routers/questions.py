@@ -4,10 +4,12 @@ Handles MCQ generation from text
 """
 from typing import Annotated
 from fastapi import APIRouter, HTTPException, status, Depends, Body
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from app.config import settings
 from app.utils.logger import logger
+from app.utils.routing import ORJSONRoute
 from app.utils.errors import LLMError, ChunkingError
 from app.models.question import (
     DifficultyLevel,
@@ -17,7 +19,7 @@ from app.models.question import (
 from app.services.question_generator import QuestionGenerator
 
 
-router = APIRouter(prefix="/api/v1/questions", tags=["Questions"])
+router = APIRouter(prefix="/api/v1/questions", tags=["Questions"], route_class=ORJSONRoute)
 
 
 # Dependency to get question generator
@@ -61,7 +63,7 @@ class QuestionGenerateBody(BaseModel):
 
 @router.post(
     "/generate",
-    response_model=QuestionGenerationResponse,
+    response_class=ORJSONResponse,
     status_code=status.HTTP_200_OK,
     summary="Generate questions from text",
     description="""
@@ -85,6 +87,7 @@ The text will be:
     """,
     responses={
         200: {
+            "model": QuestionGenerationResponse,
             "description": "Questions generated successfully",
             "content": {
                 "application/json": {
@@ -122,10 +125,13 @@ The text will be:
 async def generate_questions(
     body: Annotated[QuestionGenerateBody, Body()],
     generator: Annotated[QuestionGenerator, Depends(get_generator)],
-) -> QuestionGenerationResponse:
+) -> ORJSONResponse:
     """
     Generate multiple choice questions from text.
     
+    The response is already a validated QuestionGenerationResponse, so it is
+    serialized directly instead of being re-validated through response_model.
+    
     Args:
         body: Request body with text and generation parameters
         generator: Question generator service
@@ -157,7 +163,7 @@ async def generate_questions(
         # Close generator resources
         await generator.close()
         
-        return response
+        return ORJSONResponse(content=response.model_dump(mode="json", by_alias=True))
         
     except ChunkingError as e:
         logger.error(f"Chunking error: {e}")
@@ -3,11 +3,12 @@ Ollama LLM Client
 HTTP client for Ollama API with retry logic and exponential backoff
 """
 import asyncio
-import json
+import random
 import time
 from typing import Any
 
 import httpx
+import orjson
 
 from app.config import settings
 from app.utils.logger import logger
@@ -26,7 +27,7 @@ class OllamaClient:
     
     Features:
     - Async HTTP requests with httpx
-    - Automatic retry with exponential backoff (2s, 4s, 8s)
+    - Automatic retry with jittered exponential backoff (~2s, 4s, 8s)
     - JSON response parsing
     - Configurable model parameters
     """
@@ -34,6 +35,13 @@ class OllamaClient:
     # Exponential backoff delays in seconds
     RETRY_DELAYS = [2, 4, 8]
     
+    # Each delay is scaled by a random factor in [1 - jitter, 1 + jitter] so
+    # concurrent chunk requests that fail together don't retry in lockstep
+    RETRY_JITTER = 0.5
+    
+    # Output token budget per requested question (JSON MCQ incl. explanation)
+    TOKENS_PER_QUESTION = 300
+    
     def __init__(
         self,
         base_url: str | None = None,
@@ -172,8 +180,9 @@ class OllamaClient:
                 last_error = e
                 
                 if attempt < len(self.RETRY_DELAYS) + 1:
+                    delay *= random.uniform(1 - self.RETRY_JITTER, 1 + self.RETRY_JITTER)
                     logger.warning(
-                        f"LLM request failed, retrying in {delay}s",
+                        f"LLM request failed, retrying in {delay:.1f}s",
                         data={"attempt": attempt, "error": str(e)}
                     )
                     await asyncio.sleep(delay)
@@ -224,8 +233,8 @@ class OllamaClient:
         
         # Parse response
         try:
-            data = response.json()
-        except json.JSONDecodeError as e:
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
             raise JSONParseError(
                 response=response.text,
                 parse_error=str(e)
@@ -243,8 +252,8 @@ class OllamaClient:
         # Parse JSON from response if in JSON mode
         if payload.get("format") == "json":
             try:
-                parsed_response = json.loads(response_text)
-            except json.JSONDecodeError as e:
+                parsed_response = orjson.loads(response_text)
+            except orjson.JSONDecodeError as e:
                 raise JSONParseError(
                     response=response_text,
                     parse_error=str(e)
@@ -283,7 +292,8 @@ class OllamaClient:
         Generate questions from a text chunk.
         
         This is a convenience method that combines system and user prompts
-        for question generation.
+        for question generation. All questions come back from a single call,
+        so the output token budget is scaled to fit ``count`` questions.
         
         Args:
             text_chunk: The text to generate questions from
@@ -300,5 +310,6 @@ class OllamaClient:
         return await self.generate(
             prompt=full_prompt,
             system_prompt=system_prompt,
+            max_tokens=max(settings.llm_max_tokens, count * self.TOKENS_PER_QUESTION),
             json_mode=True,
         )
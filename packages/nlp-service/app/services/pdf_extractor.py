@@ -16,6 +16,13 @@ from app.utils.errors import PDFExtractionError, OCRRequiredError
 from app.models.pdf import PDFMetadata, PDFExtractionResponse
 
 
+# Text normalization patterns, compiled once at import
+_MULTI_NEWLINE_RE = re.compile(r"\n{3,}")
+_MULTI_SPACE_RE = re.compile(r"[ \t]+")
+_HYPHEN_BREAK_RE = re.compile(r"(\w+)-\n(\w+)")
+_DIGITS_ONLY_RE = re.compile(r"^\d+$")
+
+
 class PDFExtractor:
     """
     Extracts text from PDF documents using PyMuPDF.
@@ -41,6 +48,12 @@ class PDFExtractor:
         r"^\s*-\s*\d+\s*-\s*$",
     ]
     
+    # Compiled once for all instances; the routers build an extractor per request
+    HEADER_FOOTER_RE = re.compile(
+        "|".join(HEADER_FOOTER_PATTERNS),
+        re.IGNORECASE | re.MULTILINE
+    )
+    
     # Minimum text density (chars per page) to consider non-scanned
     MIN_TEXT_DENSITY = 100
     
@@ -52,10 +65,6 @@ class PDFExtractor:
             filter_headers_footers: Whether to filter out detected headers/footers
         """
         self.filter_headers_footers = filter_headers_footers
-        self._header_footer_regex = re.compile(
-            "|".join(self.HEADER_FOOTER_PATTERNS),
-            re.IGNORECASE | re.MULTILINE
-        )
     
     def extract_from_path(self, file_path: str | Path) -> PDFExtractionResponse:
         """
@@ -243,13 +252,13 @@ class PDFExtractor:
             return False
         
         # Check against patterns
-        if self._header_footer_regex.search(line):
+        if self.HEADER_FOOTER_RE.search(line):
             return True
         
         # Very short lines at edges are likely page numbers
         if len(line) < 20 and line_idx >= total_lines - 2:
             # Check if it's just a number
-            if re.match(r"^\d+$", line.strip()):
+            if _DIGITS_ONLY_RE.match(line.strip()):
                 return True
         
         return False
@@ -265,13 +274,13 @@ class PDFExtractor:
             Normalized text
         """
         # Replace multiple newlines with double newline
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _MULTI_NEWLINE_RE.sub("\n\n", text)
         
         # Replace multiple spaces with single space
-        text = re.sub(r"[ \t]+", " ", text)
+        text = _MULTI_SPACE_RE.sub(" ", text)
         
         # Fix hyphenated words split across lines
-        text = re.sub(r"(\w+)-\n(\w+)", r"\1\2", text)
+        text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
         
         # Remove form feed characters
         text = text.replace("\f", "\n\n")
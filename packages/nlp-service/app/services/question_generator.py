@@ -2,9 +2,14 @@
 Question Generation Service
 Orchestrates the full pipeline: chunk -> prompt -> LLM -> validate -> cache
 """
+import asyncio
+import re
 import time
+import weakref
 from typing import Any
 
+from pydantic import BaseModel, ValidationError
+
 from app.config import settings
 from app.utils.logger import logger
 from app.utils.cache import get_cache, RedisCache
@@ -21,6 +26,31 @@ from app.services.question_validator import QuestionValidator
 from app.prompts import get_system_prompt, get_user_prompt
 
 
+_WORD_RE = re.compile(r"\w+")
+
+
+# One LLM semaphore per event loop (in practice, per worker process), so
+# OLLAMA_MAX_CONCURRENCY caps calls across all requests, not within each one
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore bounding concurrent LLM calls on the running loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(settings.ollama_max_concurrency)
+    return semaphore
+
+
+class _CachedQuestionSet(BaseModel):
+    """Cached question set; other stored keys are ignored on load."""
+    
+    questions: list[GeneratedQuestion]
+
+
 class QuestionGenerator:
     """
     Orchestrates question generation from text.
@@ -29,9 +59,16 @@ class QuestionGenerator:
     1. Chunk text into semantic segments
     2. For each chunk: check cache -> generate -> validate
     3. Cache valid results
-    4. Return aggregated questions
+    4. Drop near-duplicate questions and return the rest
     """
     
+    # Jaccard similarity of word 3-shingles at which two questions with the
+    # same correct answer count as duplicates
+    DUPLICATE_SIMILARITY = 0.7
+    
+    # Words per shingle when comparing question wording
+    SHINGLE_SIZE = 3
+    
     def __init__(
         self,
         chunker: TextChunker | None = None,
@@ -85,38 +122,55 @@ class QuestionGenerator:
         logger.debug(f"Created {len(chunks)} chunks from input text")
         
         # Generate questions from each chunk
-        all_questions: list[GeneratedQuestion] = []
+        chunk_results: list[list[GeneratedQuestion]] = [[] for _ in chunks]
         total_generated = 0
         from_cache = False
         
         # Calculate questions per chunk
         questions_per_chunk = max(1, request.count // len(chunks)) if chunks else request.count
         
-        for chunk in chunks:
-            # Check cache first
+        # Serve what we can from cache; the rest goes to the LLM
+        pending: list[int] = []
+        for i, chunk in enumerate(chunks):
             if request.use_cache:
-                cached = self._get_from_cache(chunk, request.difficulty)
+                cached = self._get_from_cache(chunk, request.difficulty, questions_per_chunk)
                 if cached:
-                    all_questions.extend(cached)
+                    chunk_results[i] = cached
                     total_generated += len(cached)
                     from_cache = True
                     continue
-            
-            # Generate questions for this chunk
-            chunk_questions, generated_count = await self._generate_for_chunk(
-                chunk=chunk,
-                difficulty=request.difficulty,
-                count=questions_per_chunk,
-            )
-            
+            pending.append(i)
+        
+        # Generate uncached chunks concurrently, bounded to what Ollama can
+        # serve; the semaphore is shared with every other in-flight request
+        semaphore = get_llm_semaphore()
+        
+        async def generate_bounded(chunk: TextChunk) -> tuple[list[GeneratedQuestion], int]:
+            async with semaphore:
+                return await self._generate_for_chunk(
+                    chunk=chunk,
+                    difficulty=request.difficulty,
+                    count=questions_per_chunk,
+                )
+        
+        generated = await asyncio.gather(*(generate_bounded(chunks[i]) for i in pending))
+        
+        for i, (chunk_questions, generated_count) in zip(pending, generated):
             total_generated += generated_count
             
             if chunk_questions:
-                all_questions.extend(chunk_questions)
+                chunk_results[i] = chunk_questions
                 
                 # Cache the results
                 if request.use_cache:
-                    self._save_to_cache(chunk, request.difficulty, chunk_questions)
+                    self._save_to_cache(
+                        chunks[i], request.difficulty, questions_per_chunk, chunk_questions
+                    )
+        
+        # Keep questions in chunk order; overlapping chunks often repeat questions
+        all_questions = self._deduplicate(
+            [q for questions in chunk_results for q in questions]
+        )
         
         # Limit to requested count
         if len(all_questions) > request.count:
@@ -185,16 +239,15 @@ class QuestionGenerator:
                 )
                 return [], 0
             
-            # Validate each question
+            # Validate the batch against the chunk it came from
             valid_questions: list[GeneratedQuestion] = []
+            results = self.validator.batch_validate(
+                questions_data,
+                difficulty=difficulty,
+                source_text=chunk.text,
+            )
             
-            for q_data in questions_data:
-                validation_result, validated_question = self.validator.validate(
-                    question_data=q_data,
-                    difficulty=difficulty,
-                    source_text=chunk.text,
-                )
-                
+            for validation_result, validated_question in results:
                 if validation_result.is_valid and validated_question:
                     valid_questions.append(validated_question)
                 else:
@@ -216,10 +269,64 @@ class QuestionGenerator:
             )
             return [], 0
     
+    def _deduplicate(self, questions: list[GeneratedQuestion]) -> list[GeneratedQuestion]:
+        """
+        Drop questions whose wording nearly matches an earlier question.
+        
+        Wording is compared as sets of overlapping word 3-shingles, so
+        questions that only share a stem ("What is the function of ...")
+        stay distinct. A question is only dropped if its correct answer
+        text also matches the earlier question's.
+        
+        Args:
+            questions: Questions in output order
+            
+        Returns:
+            Questions with near-duplicates removed, order preserved
+        """
+        kept: list[GeneratedQuestion] = []
+        kept_keys: list[tuple[str, frozenset[tuple[str, ...]]]] = []
+        
+        for question in questions:
+            answer = self._correct_answer_text(question)
+            shingles = self._shingles(question.question_text)
+            
+            if any(
+                answer == other_answer
+                and len(shingles & other) / len(shingles | other) >= self.DUPLICATE_SIMILARITY
+                for other_answer, other in kept_keys
+            ):
+                continue
+            
+            kept.append(question)
+            kept_keys.append((answer, shingles))
+        
+        if len(kept) < len(questions):
+            logger.debug(f"Dropped {len(questions) - len(kept)} near-duplicate questions")
+        
+        return kept
+    
+    def _shingles(self, text: str) -> frozenset[tuple[str, ...]]:
+        """Overlapping word n-grams of text; a shorter text is one shingle."""
+        words = _WORD_RE.findall(text.lower())
+        n = self.SHINGLE_SIZE
+        if len(words) <= n:
+            return frozenset([tuple(words)])
+        return frozenset(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+    
+    @staticmethod
+    def _correct_answer_text(question: GeneratedQuestion) -> str:
+        """Normalized text of the question's correct option."""
+        for option in question.options:
+            if option.id == question.correct_answer:
+                return " ".join(_WORD_RE.findall(option.text.lower()))
+        return ""
+    
     def _get_from_cache(
         self,
         chunk: TextChunk,
-        difficulty: DifficultyLevel
+        difficulty: DifficultyLevel,
+        count: int,
     ) -> list[GeneratedQuestion] | None:
         """
         Get questions from cache.
@@ -227,35 +334,36 @@ class QuestionGenerator:
         Args:
             chunk: Text chunk
             difficulty: Difficulty level
+            count: Number of questions requested for the chunk
             
         Returns:
             List of cached questions or None
         """
         try:
-            cached_data = self.cache.get_questions(chunk.text, difficulty.value)
+            raw = self.cache.get_questions_raw(chunk.text, difficulty.value, count)
             
-            if cached_data and "questions" in cached_data:
-                questions = []
-                for q_data in cached_data["questions"]:
-                    try:
-                        question = GeneratedQuestion(**q_data)
-                        questions.append(question)
-                    except Exception:
-                        continue
-                
-                if questions:
-                    logger.debug(
-                        "Cache hit",
-                        data={
-                            "chunk_hash": chunk.hash[:8],
-                            "difficulty": difficulty.value,
-                            "count": len(questions),
-                        }
-                    )
-                    return questions
+            if raw is None:
+                return None
+            
+            # Parse and validate the cached JSON in one pass
+            questions = _CachedQuestionSet.model_validate_json(raw).questions
+            
+            if questions:
+                logger.debug(
+                    "Cache hit",
+                    data={
+                        "chunk_hash": chunk.hash[:8],
+                        "difficulty": difficulty.value,
+                        "count": len(questions),
+                    }
+                )
+                return questions
             
             return None
             
+        except ValidationError as e:
+            logger.warning(f"Discarding invalid cached questions: {e.error_count()} errors")
+            return None
         except Exception as e:
             logger.warning(f"Cache get failed: {e}")
             return None
@@ -264,6 +372,7 @@ class QuestionGenerator:
         self,
         chunk: TextChunk,
         difficulty: DifficultyLevel,
+        count: int,
         questions: list[GeneratedQuestion]
     ) -> None:
         """
@@ -272,6 +381,7 @@ class QuestionGenerator:
         Args:
             chunk: Text chunk
             difficulty: Difficulty level
+            count: Number of questions requested for the chunk
             questions: Questions to cache
         """
         try:
@@ -284,7 +394,7 @@ class QuestionGenerator:
                 "difficulty": difficulty.value,
             }
             
-            self.cache.set_questions(chunk.text, difficulty.value, cache_data)
+            self.cache.set_questions(chunk.text, difficulty.value, count, cache_data)
             
         except Exception as e:
             logger.warning(f"Cache save failed: {e}")
@@ -14,6 +14,16 @@ from app.models.question import (
 )
 
 
+REQUIRED_FIELDS = ("questionText", "options", "correctAnswer", "explanation")
+OPTION_IDS = frozenset({"A", "B", "C", "D"})
+DIFFICULTY_BY_VALUE = {level.value: level for level in DifficultyLevel}
+
+# Content checks, compiled once at import
+_ALL_NONE_RE = re.compile(r"(?:all|none) of the above", re.IGNORECASE)
+_NEGATIVE_RE = re.compile(r"\b(?:not|except|never|none)\b", re.IGNORECASE)
+_TERM_RE = re.compile(r"\b\w{4,}\b")
+
+
 class QuestionValidator:
     """
     Validates generated questions through multiple stages.
@@ -47,6 +57,9 @@ class QuestionValidator:
         """Initialize the validator."""
         self.min_quality_score = settings.min_quality_score
         self.auto_approve_score = settings.auto_approve_score
+        
+        # Last (source_text, lowercased) pair; questions in a batch share a source
+        self._lowered_source: tuple[str, str] | None = None
     
     def validate(
         self,
@@ -128,7 +141,12 @@ class QuestionValidator:
         if schema_valid:
             try:
                 # Set the difficulty from input or question data
-                q_difficulty = difficulty or DifficultyLevel(question_data.get("difficulty", "medium"))
+                q_difficulty = difficulty
+                if q_difficulty is None:
+                    raw_difficulty = question_data.get("difficulty", "medium")
+                    q_difficulty = DIFFICULTY_BY_VALUE.get(raw_difficulty)
+                    if q_difficulty is None:
+                        raise ValueError(f"Invalid difficulty: {raw_difficulty!r}")
                 
                 validated_question = GeneratedQuestion(
                     question_text=question_data["questionText"],
@@ -176,11 +194,10 @@ class QuestionValidator:
         score = 1.0
         
         # Check required fields
-        required_fields = ["questionText", "options", "correctAnswer", "explanation"]
-        for field in required_fields:
-            if field not in data:
-                issues.append(f"Missing required field: {field}")
-                score -= 0.25
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in data]
+        for field in missing_fields:
+            issues.append(f"Missing required field: {field}")
+            score -= 0.25
         
         if score < 0.5:
             return False, issues, max(0, score)
@@ -214,10 +231,9 @@ class QuestionValidator:
                 score -= 0.05
         
         # Check for A, B, C, D
-        expected_ids = {"A", "B", "C", "D"}
-        if option_ids != expected_ids:
-            missing = expected_ids - option_ids
-            extra = option_ids - expected_ids
+        if option_ids != OPTION_IDS:
+            missing = set(OPTION_IDS - option_ids)
+            extra = option_ids - OPTION_IDS
             if missing:
                 issues.append(f"Missing option IDs: {missing}")
             if extra:
@@ -226,11 +242,11 @@ class QuestionValidator:
         
         # Validate correct answer
         correct = data.get("correctAnswer", "")
-        if correct not in expected_ids:
+        if correct not in OPTION_IDS:
             issues.append(f"Invalid correct answer: {correct}")
             score -= 0.2
         
-        is_valid = score >= 0.5 and len([i for i in issues if "Missing required" in i]) == 0
+        is_valid = score >= 0.5 and not missing_fields
         return is_valid, issues, max(0, score)
     
     def _validate_lengths(self, data: dict[str, Any]) -> tuple[bool, list[str], float, dict]:
@@ -311,37 +327,29 @@ class QuestionValidator:
         score = 1.0
         metrics: dict[str, Any] = {}
         
-        question_text = data.get("questionText", "").lower()
+        question_text = data.get("questionText", "")
         options = data.get("options", [])
         explanation = data.get("explanation", "").lower()
         
         # Check for question quality markers
         # Questions should end with ?
-        if not data.get("questionText", "").strip().endswith("?"):
+        if not question_text.strip().endswith("?"):
             issues.append("Question should end with '?'")
             score -= 0.1
         
         # Check for "all/none of the above" patterns
-        for opt in options:
-            opt_text = opt.get("text", "").lower() if isinstance(opt, dict) else ""
-            if "all of the above" in opt_text or "none of the above" in opt_text:
-                issues.append("Avoid 'all/none of the above' options")
-                score -= 0.15
-                break
+        if any(
+            isinstance(opt, dict) and _ALL_NONE_RE.search(opt.get("text", ""))
+            for opt in options
+        ):
+            issues.append("Avoid 'all/none of the above' options")
+            score -= 0.15
         
         # Check for negative phrasing
-        negative_patterns = [
-            r"\bnot\b",
-            r"\bexcept\b",
-            r"\bnever\b",
-            r"\bnone\b",
-        ]
-        for pattern in negative_patterns:
-            if re.search(pattern, question_text):
-                issues.append("Consider avoiding negative phrasing in questions")
-                score -= 0.05
-                metrics["has_negative_phrasing"] = True
-                break
+        if _NEGATIVE_RE.search(question_text):
+            issues.append("Consider avoiding negative phrasing in questions")
+            score -= 0.05
+            metrics["has_negative_phrasing"] = True
         
         # Check for duplicate options
         option_texts = [
@@ -393,12 +401,12 @@ class QuestionValidator:
         if not source_text:
             return True, issues, score, metrics
         
-        source_lower = source_text.lower()
+        source_lower = self._lower_source(source_text)
         question_text = data.get("questionText", "")
         
         # Extract key terms from question
         question_words = set(
-            word.lower() for word in re.findall(r'\b\w{4,}\b', question_text)
+            word.lower() for word in _TERM_RE.findall(question_text)
         )
         
         # Check if question terms appear in source
@@ -424,7 +432,7 @@ class QuestionValidator:
         if correct_option:
             correct_text = correct_option.get("text", "").lower()
             correct_words = set(
-                word for word in re.findall(r'\b\w{4,}\b', correct_text)
+                word for word in _TERM_RE.findall(correct_text)
             )
             
             correct_terms_in_source = sum(1 for word in correct_words if word in source_lower)
@@ -439,6 +447,15 @@ class QuestionValidator:
         is_valid = score >= 0.5
         return is_valid, issues, max(0, score), metrics
     
+    def _lower_source(self, source_text: str) -> str:
+        """Lowercase source text, reusing the result for the same source object."""
+        if self._lowered_source is not None and self._lowered_source[0] is source_text:
+            return self._lowered_source[1]
+        
+        source_lower = source_text.lower()
+        self._lowered_source = (source_text, source_lower)
+        return source_lower
+    
     def batch_validate(
         self,
         questions_data: list[dict[str, Any]],
@@ -448,6 +465,9 @@ class QuestionValidator:
         """
         Validate multiple questions.
         
+        Questions sharing ``source_text`` reuse its lowercased form, so the
+        source is only lowercased once per batch.
+        
         Args:
             questions_data: List of raw question data
             difficulty: Expected difficulty level
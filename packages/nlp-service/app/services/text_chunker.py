@@ -1,9 +1,13 @@
 """
 Text Chunking Service
-Splits text into semantic chunks using spaCy for sentence boundary detection
+Splits text into semantic chunks along sentence boundaries
 """
 import hashlib
+import re
 import time
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
 from typing import Iterator
 
 import spacy
@@ -15,6 +19,45 @@ from app.utils.errors import ChunkingError
 from app.models.pdf import TextChunk, ChunkingResponse
 
 
+# Sentence boundary: whitespace after terminal punctuation, optionally
+# followed by a closing quote or bracket
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+|(?<=[.!?][\"')\]])\s+")
+
+# Blank line between paragraphs
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+# Paragraphs handed to spaCy per nlp.pipe batch
+SPACY_BATCH_SIZE = 64
+
+
+@lru_cache(maxsize=1)
+def load_nlp() -> Language:
+    """
+    Load the spaCy pipeline used for sentence splitting.
+    
+    Loaded once per process and shared by all TextChunker instances, since
+    the routers build a new chunker for every request. Only sentence
+    boundaries are needed, so every component except the sentencizer is
+    disabled.
+    """
+    try:
+        # Try to load the English model
+        nlp = spacy.load(
+            "en_core_web_sm",
+            disable=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"],
+        )
+        # Add sentencizer for sentence boundary detection
+        if "sentencizer" not in nlp.pipe_names:
+            nlp.add_pipe("sentencizer")
+        logger.info("Loaded spaCy model: en_core_web_sm")
+    except OSError:
+        # Fall back to blank model with sentencizer
+        logger.warning("en_core_web_sm not found, using blank English model")
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+    return nlp
+
+
 class TextChunker:
     """
     Chunks text into semantically meaningful segments.
@@ -22,7 +65,7 @@ class TextChunker:
     Features:
     - Target chunk size of 800 words (±10%)
     - 200 word overlap between chunks
-    - Respects sentence boundaries using spaCy
+    - Respects sentence boundaries (regex split, or spaCy when enabled)
     - Generates chunk hashes for caching
     """
     
@@ -31,6 +74,7 @@ class TextChunker:
         chunk_size_words: int | None = None,
         overlap_words: int | None = None,
         respect_sentences: bool = True,
+        use_spacy: bool | None = None,
     ):
         """
         Initialize the text chunker.
@@ -39,35 +83,22 @@ class TextChunker:
             chunk_size_words: Target chunk size in words (default from config)
             overlap_words: Number of words to overlap between chunks
             respect_sentences: Whether to respect sentence boundaries
+            use_spacy: Split sentences with spaCy instead of the regex
+                splitter (default from config)
         """
         self.chunk_size_words = chunk_size_words or settings.chunk_size_words
         self.overlap_words = overlap_words or settings.chunk_overlap_words
         self.respect_sentences = respect_sentences
+        self.use_spacy = settings.chunk_use_spacy if use_spacy is None else use_spacy
         
         # Calculate tolerance (±10%)
         self.min_chunk_words = int(self.chunk_size_words * 0.9)
         self.max_chunk_words = int(self.chunk_size_words * 1.1)
-        
-        # Load spaCy model lazily
-        self._nlp: Language | None = None
     
     @property
     def nlp(self) -> Language:
-        """Get or load spaCy model."""
-        if self._nlp is None:
-            try:
-                # Try to load the English model
-                self._nlp = spacy.load("en_core_web_sm", disable=["ner", "parser"])
-                # Add sentencizer for sentence boundary detection
-                if "sentencizer" not in self._nlp.pipe_names:
-                    self._nlp.add_pipe("sentencizer")
-                logger.info("Loaded spaCy model: en_core_web_sm")
-            except OSError:
-                # Fall back to blank model with sentencizer
-                logger.warning("en_core_web_sm not found, using blank English model")
-                self._nlp = spacy.blank("en")
-                self._nlp.add_pipe("sentencizer")
-        return self._nlp
+        """Get the process-wide spaCy pipeline (loaded on first use)."""
+        return load_nlp()
     
     def chunk_text(self, text: str) -> ChunkingResponse:
         """
@@ -97,6 +128,7 @@ class TextChunker:
                 end_index=len(text),
                 overlap_start=False,
                 overlap_end=False,
+                word_count=original_word_count,
             )
             return ChunkingResponse(
                 chunks=[chunk],
@@ -134,22 +166,54 @@ class TextChunker:
         )
     
     def _get_sentences(self, text: str) -> list[str]:
+        """
+        Extract sentences from text.
+        
+        Splits on whitespace following terminal punctuation, which is what
+        the rule-based spaCy sentencizer keys on as well, without tokenizing
+        the whole document. spaCy is used instead when ``use_spacy`` is set.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            List of sentence strings
+        """
+        if self.use_spacy:
+            return self._get_sentences_spacy(text)
+        
+        return [s for s in map(str.strip, _SENTENCE_BREAK_RE.split(text)) if s]
+    
+    def _get_sentences_spacy(self, text: str) -> list[str]:
         """
         Extract sentences from text using spaCy.
         
+        The text is split into paragraphs and streamed through ``nlp.pipe``
+        in batches, so spaCy works on many small docs rather than one doc
+        the size of the whole input. A paragraph break always ends a
+        sentence.
+        
         Args:
             text: Input text
             
         Returns:
             List of sentence strings
         """
-        # Process with spaCy (increase max_length for large docs)
-        self.nlp.max_length = max(len(text) + 1000, 1000000)
-        doc = self.nlp(text)
+        nlp = self.nlp
+        paragraphs = [p for p in _PARAGRAPH_BREAK_RE.split(text) if p.strip()]
         
-        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+        # Increase max_length for very long paragraphs; the pipeline is
+        # shared, so only ever raise it
+        longest = max((len(p) for p in paragraphs), default=0)
+        if longest >= nlp.max_length:
+            nlp.max_length = longest + 1000
         
-        return sentences
+        sentences = (
+            sent.text.strip()
+            for doc in nlp.pipe(paragraphs, batch_size=SPACY_BATCH_SIZE)
+            for sent in doc.sents
+        )
+        return [s for s in sentences if s]
     
     def _create_chunks_from_sentences(
         self,
@@ -159,6 +223,10 @@ class TextChunker:
         """
         Create chunks from sentences respecting word count targets.
         
+        Word counts are summed once into a prefix array, so each chunk end
+        and overlap start is found by binary search rather than by
+        re-counting the words of the sentences in the current window.
+        
         Args:
             sentences: List of sentences
             original_text: Original full text for position tracking
@@ -166,86 +234,94 @@ class TextChunker:
         Yields:
             TextChunk objects
         """
-        chunk_index = 0
-        current_sentences: list[str] = []
-        current_word_count = 0
-        overlap_sentences: list[str] = []
+        # cum_words[i] is the word count of sentences[:i]
+        cum_words = list(accumulate((len(s.split()) for s in sentences), initial=0))
+        sentence_count = len(sentences)
         
-        text_position = 0
+        chunk_index = 0
+        start = 0
+        search_from = 1
         chunk_start_position = 0
         
-        for sentence in sentences:
-            sentence_words = len(sentence.split())
+        while True:
+            # First window sentences[start:end] reaching the target size; it
+            # always takes at least one sentence past the previous chunk
+            end = bisect_left(cum_words, cum_words[start] + self.chunk_size_words, lo=search_from)
+            if end > sentence_count:
+                break
+            
+            current_sentences = sentences[start:end]
+            chunk_text = " ".join(current_sentences)
+            
+            # Find position in original text
+            chunk_start = original_text.find(current_sentences[0][:50], chunk_start_position)
+            if chunk_start == -1:
+                chunk_start = chunk_start_position
+            chunk_end = chunk_start + len(chunk_text)
             
-            # Add sentence to current chunk
-            current_sentences.append(sentence)
-            current_word_count += sentence_words
+            yield self._create_chunk(
+                text=chunk_text,
+                chunk_index=chunk_index,
+                start_index=chunk_start,
+                end_index=chunk_end,
+                overlap_start=chunk_index > 0,
+                overlap_end=True,
+                word_count=cum_words[end] - cum_words[start],
+            )
+            
+            chunk_index += 1
+            chunk_start_position = chunk_end
             
-            # Check if we've reached target chunk size
-            if current_word_count >= self.min_chunk_words:
-                # Check if we should include the next sentence or stop
-                if current_word_count >= self.chunk_size_words:
-                    # Create chunk
-                    chunk_text = " ".join(current_sentences)
-                    
-                    # Find position in original text
-                    try:
-                        chunk_start = original_text.find(current_sentences[0][:50], chunk_start_position)
-                        if chunk_start == -1:
-                            chunk_start = chunk_start_position
-                        chunk_end = chunk_start + len(chunk_text)
-                    except:
-                        chunk_start = chunk_start_position
-                        chunk_end = chunk_start + len(chunk_text)
-                    
-                    yield self._create_chunk(
-                        text=chunk_text,
-                        chunk_index=chunk_index,
-                        start_index=chunk_start,
-                        end_index=chunk_end,
-                        overlap_start=chunk_index > 0,
-                        overlap_end=True,  # Will be updated for last chunk
-                    )
-                    
-                    chunk_index += 1
-                    chunk_start_position = chunk_end
-                    
-                    # Calculate overlap - get last N words worth of sentences
-                    overlap_sentences = self._get_overlap_sentences(
-                        current_sentences,
-                        self.overlap_words
-                    )
-                    
-                    # Start new chunk with overlap
-                    current_sentences = overlap_sentences.copy()
-                    current_word_count = sum(len(s.split()) for s in current_sentences)
+            # Start the next chunk with the trailing overlap sentences
+            start = self._overlap_start(cum_words, start, end, self.overlap_words)
+            search_from = end + 1
         
         # Handle remaining sentences
-        if current_sentences:
+        if start < sentence_count:
+            current_word_count = cum_words[sentence_count] - cum_words[start]
+            
             # Don't create tiny leftover chunks - merge with previous if needed
             if current_word_count < self.min_chunk_words // 2 and chunk_index > 0:
                 # Skip this chunk as it's too small
-                pass
-            else:
-                chunk_text = " ".join(current_sentences)
-                
-                try:
-                    chunk_start = original_text.find(current_sentences[0][:50], chunk_start_position)
-                    if chunk_start == -1:
-                        chunk_start = chunk_start_position
-                    chunk_end = len(original_text)
-                except:
-                    chunk_start = chunk_start_position
-                    chunk_end = len(original_text)
-                
-                yield self._create_chunk(
-                    text=chunk_text,
-                    chunk_index=chunk_index,
-                    start_index=chunk_start,
-                    end_index=chunk_end,
-                    overlap_start=chunk_index > 0,
-                    overlap_end=False,  # Last chunk has no overlap at end
-                )
+                return
+            
+            current_sentences = sentences[start:]
+            chunk_text = " ".join(current_sentences)
+            
+            chunk_start = original_text.find(current_sentences[0][:50], chunk_start_position)
+            if chunk_start == -1:
+                chunk_start = chunk_start_position
+            chunk_end = len(original_text)
+            
+            yield self._create_chunk(
+                text=chunk_text,
+                chunk_index=chunk_index,
+                start_index=chunk_start,
+                end_index=chunk_end,
+                overlap_start=chunk_index > 0,
+                overlap_end=False,  # Last chunk has no overlap at end
+                word_count=current_word_count,
+            )
+    
+    @staticmethod
+    def _overlap_start(cum_words: list[int], start: int, end: int, target_words: int) -> int:
+        """
+        Find where the overlap for sentences[start:end] begins.
+        
+        The overlap is the longest run of trailing sentences totalling at
+        most target_words, and always includes the last sentence.
+        
+        Args:
+            cum_words: Prefix sums of sentence word counts
+            start: Index of the first sentence in the window
+            end: Index one past the last sentence in the window
+            target_words: Target word count for overlap
+            
+        Returns:
+            Index of the first overlap sentence
+        """
+        overlap_start = bisect_left(cum_words, cum_words[end] - target_words, lo=start, hi=end)
+        return min(overlap_start, end - 1)
     
     def _get_overlap_sentences(
         self,
@@ -262,17 +338,11 @@ class TextChunker:
         Returns:
             List of sentences for overlap
         """
-        overlap: list[str] = []
-        word_count = 0
-        
-        for sentence in reversed(sentences):
-            sentence_words = len(sentence.split())
-            if word_count + sentence_words > target_words and overlap:
-                break
-            overlap.insert(0, sentence)
-            word_count += sentence_words
+        if not sentences:
+            return []
         
-        return overlap
+        cum_words = list(accumulate((len(s.split()) for s in sentences), initial=0))
+        return sentences[self._overlap_start(cum_words, 0, len(sentences), target_words):]
     
     def _create_chunk(
         self,
@@ -282,6 +352,7 @@ class TextChunker:
         end_index: int,
         overlap_start: bool,
         overlap_end: bool,
+        word_count: int | None = None,
     ) -> TextChunk:
         """
         Create a TextChunk object.
@@ -293,17 +364,19 @@ class TextChunker:
             end_index: End position in original text
             overlap_start: Whether chunk starts with overlap
             overlap_end: Whether chunk ends with overlap
+            word_count: Words in the chunk, if already known (counted otherwise)
             
         Returns:
             TextChunk object
         """
-        words = text.split()
+        if word_count is None:
+            word_count = len(text.split())
         chunk_hash = hashlib.sha256(text.encode()).hexdigest()[:16]
         
         return TextChunk(
             id=f"chunk_{chunk_index}_{chunk_hash[:8]}",
             text=text,
-            word_count=len(words),
+            word_count=word_count,
             char_count=len(text),
             start_index=start_index,
             end_index=end_index,
@@ -13,6 +13,7 @@ from app.utils.errors import (
     CacheError,
 )
 from app.utils.cache import RedisCache, get_cache
+from app.utils.routing import ORJSONRequest, ORJSONRoute
 
 __all__ = [
     "logger",
@@ -27,4 +28,6 @@ __all__ = [
     "CacheError",
     "RedisCache",
     "get_cache",
+    "ORJSONRequest",
+    "ORJSONRoute",
 ]
@@ -3,24 +3,31 @@ Redis caching utilities for NLP Service
 Handles question caching with TTL and hash-based keys
 """
 import hashlib
-import json
+import logging
+import time
 from typing import Any
 from functools import lru_cache
 
+import orjson
 import redis
 from redis.exceptions import RedisError
 
 from app.config import settings
+from app.prompts import PROMPT_VERSION
 from app.utils.logger import logger
 
 
 class RedisCache:
     """Redis cache client with NLP-specific helpers."""
     
+    # Seconds to skip cache calls after a Redis error (circuit breaker)
+    DISABLE_BACKOFF_SECONDS = 30.0
+    
     def __init__(self):
         """Initialize Redis connection."""
         self._client: redis.Redis | None = None
         self._connected = False
+        self._disabled_until = 0.0
     
     @property
     def client(self) -> redis.Redis:
@@ -40,10 +47,24 @@ class RedisCache:
     def is_connected(self) -> bool:
         """Check if Redis is connected and responsive."""
         try:
-            return self.client.ping()
+            connected = self.client.ping()
         except RedisError as e:
-            logger.warning(f"Redis connection check failed: {e}")
+            logger.warning("Redis connection check failed: %s", e)
+            self._trip()
             return False
+        
+        # A successful ping re-enables the cache before the back-off expires
+        if connected:
+            self._disabled_until = 0.0
+        return connected
+    
+    def _is_disabled(self) -> bool:
+        """Whether cache calls are short-circuited after a recent Redis error."""
+        return time.monotonic() < self._disabled_until
+    
+    def _trip(self) -> None:
+        """Disable cache calls for the back-off window after a Redis error."""
+        self._disabled_until = time.monotonic() + self.DISABLE_BACKOFF_SECONDS
     
     def _build_key(self, *parts: str) -> str:
         """Build a cache key with prefix."""
@@ -54,13 +75,37 @@ class RedisCache:
         """Generate SHA256 hash of text, truncated to 16 chars."""
         return hashlib.sha256(text.encode()).hexdigest()[:16]
     
-    def get_question_cache_key(self, chunk_text: str, difficulty: str) -> str:
+    def get_question_cache_key(self, chunk_text: str, difficulty: str, count: int) -> str:
         """
         Generate cache key for question generation.
-        Format: nlp:questions:v1:{chunk_hash}:{difficulty}
+        Format: nlp:questions:v2:{digest}, where digest is a BLAKE2b hash of
+        the chunk text, difficulty, question count and prompt version.
         """
-        chunk_hash = self.hash_text(chunk_text)
-        return self._build_key(f"questions:v1:{chunk_hash}:{difficulty}")
+        digest = hashlib.blake2b(
+            f"{chunk_text}|{difficulty}|{count}|{PROMPT_VERSION}".encode(),
+            digest_size=16,
+        ).hexdigest()
+        return self._build_key(f"questions:v2:{digest}")
+    
+    def get_raw(self, key: str) -> str | None:
+        """
+        Get the serialized value from cache without decoding it.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached JSON string or None if not found
+        """
+        if self._is_disabled():
+            return None
+        
+        try:
+            return self.client.get(key)
+        except RedisError as e:
+            logger.error("Cache get error: %s", e, data={"key": key})
+            self._trip()
+            return None
     
     def get(self, key: str) -> Any | None:
         """
@@ -72,16 +117,14 @@ class RedisCache:
         Returns:
             Cached value (JSON parsed) or None if not found
         """
-        try:
-            value = self.client.get(key)
-            if value is not None:
-                return json.loads(value)
-            return None
-        except RedisError as e:
-            logger.error(f"Cache get error: {e}", data={"key": key})
+        value = self.get_raw(key)
+        if value is None:
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Cache JSON decode error: {e}", data={"key": key})
+        
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError as e:
+            logger.error("Cache JSON decode error: %s", e, data={"key": key})
             return None
     
     def set(
@@ -101,53 +144,59 @@ class RedisCache:
         Returns:
             True if successful, False otherwise
         """
+        if self._is_disabled():
+            return False
+        
         try:
             ttl = ttl or settings.cache_ttl_seconds
-            serialized = json.dumps(value, default=str)
+            serialized = orjson.dumps(value, default=str)
             self.client.setex(key, ttl, serialized)
             return True
         except RedisError as e:
-            logger.error(f"Cache set error: {e}", data={"key": key})
+            logger.error("Cache set error: %s", e, data={"key": key})
+            self._trip()
             return False
-        except (TypeError, json.JSONEncodeError) as e:
-            logger.error(f"Cache serialization error: {e}", data={"key": key})
+        except orjson.JSONEncodeError as e:
+            logger.error("Cache serialization error: %s", e, data={"key": key})
             return False
     
     def delete(self, key: str) -> bool:
         """Delete a key from cache."""
+        if self._is_disabled():
+            return False
+        
         try:
             self.client.delete(key)
             return True
         except RedisError as e:
-            logger.error(f"Cache delete error: {e}", data={"key": key})
+            logger.error("Cache delete error: %s", e, data={"key": key})
+            self._trip()
             return False
     
-    def get_questions(self, chunk_text: str, difficulty: str) -> dict[str, Any] | None:
+    def get_questions_raw(
+        self,
+        chunk_text: str,
+        difficulty: str,
+        count: int,
+    ) -> str | None:
         """
-        Get cached questions for a chunk.
+        Get the serialized cached questions for a chunk.
         
         Args:
             chunk_text: The text chunk
             difficulty: Difficulty level
+            count: Number of questions requested for the chunk
             
         Returns:
-            Cached question data or None
+            Cached JSON string (left for the caller to validate) or None
         """
-        key = self.get_question_cache_key(chunk_text, difficulty)
-        data = self.get(key)
-        
-        if data:
-            logger.debug("Cache hit for questions", data={
-                "difficulty": difficulty,
-                "chunk_hash": self.hash_text(chunk_text),
-            })
-        
-        return data
+        return self.get_raw(self.get_question_cache_key(chunk_text, difficulty, count))
     
     def set_questions(
         self, 
         chunk_text: str, 
         difficulty: str, 
+        count: int,
         questions_data: dict[str, Any]
     ) -> bool:
         """
@@ -156,15 +205,16 @@ class RedisCache:
         Args:
             chunk_text: The text chunk
             difficulty: Difficulty level
+            count: Number of questions requested for the chunk
             questions_data: Question generation result
             
         Returns:
             True if cached successfully
         """
-        key = self.get_question_cache_key(chunk_text, difficulty)
+        key = self.get_question_cache_key(chunk_text, difficulty, count)
         success = self.set(key, questions_data)
         
-        if success:
+        if success and logger.isEnabledFor(logging.DEBUG):
             logger.debug("Cached questions", data={
                 "difficulty": difficulty,
                 "chunk_hash": self.hash_text(chunk_text),
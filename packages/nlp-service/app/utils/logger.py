@@ -81,6 +81,8 @@ class ContextLogger(logging.Logger):
         **kwargs: Any
     ) -> None:
         """Log with extra context data."""
+        if not self.isEnabledFor(level):
+            return
         if extra_data:
             kwargs.setdefault("extra", {})["extra_data"] = extra_data
         super()._log(level, msg, args, **kwargs)
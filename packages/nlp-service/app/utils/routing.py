@@ -0,0 +1,35 @@
+"""
+Custom FastAPI routing classes
+Parses JSON request bodies with orjson instead of the stdlib json module
+"""
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is decoded with orjson."""
+    
+    async def json(self) -> Any:
+        """Decode and memoize the request body as JSON."""
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so
+            # FastAPI still turns malformed bodies into a 422 response
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """API route that hands endpoints an ORJSONRequest."""
+    
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """Wrap the default handler to swap in the orjson-backed request."""
+        handler = super().get_route_handler()
+        
+        async def orjson_route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+        
+        return orjson_route_handler
@@ -1,8 +1,11 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
+from functools import lru_cache
 from dotenv import load_dotenv
+import asyncio
 import httpx
 import json
 import time
@@ -13,26 +16,46 @@ import tempfile
 # Load environment variables from .env file
 load_dotenv()
 
+
+@lru_cache(maxsize=1)
+def _env() -> tuple[str, str, str, str]:
+    """Read environment configuration once: (api_key, model, frontend_url, cors_origin)"""
+    return (
+        os.getenv("OPENROUTER_API_KEY", ""),
+        os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.2-3b-instruct:free"),
+        os.getenv("FRONTEND_URL", "http://localhost:5173"),
+        os.getenv("CORS_ORIGIN", "http://localhost:5173"),
+    )
+
+
+# OpenRouter API configuration
+OPENROUTER_API_KEY, OPENROUTER_MODEL, FRONTEND_URL, CORS_ORIGIN = _env()
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Request headers are constant for the lifetime of the process
+BASE_HEADERS = {
+    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+    "Content-Type": "application/json",
+    "HTTP-Referer": FRONTEND_URL,
+    "X-Title": "QuizGenius"
+}
+
 app = FastAPI(
     title="NLP Service",
     description="Quiz generation service using OpenRouter API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[os.getenv("CORS_ORIGIN", "http://localhost:5173")],
+    allow_origins=[CORS_ORIGIN],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# OpenRouter API configuration
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
-OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.2-3b-instruct:free")
-
 # Models
 class QuestionRequest(BaseModel):
     text: str = Field(..., min_length=50, max_length=50000)
@@ -43,7 +66,7 @@ class Question(BaseModel):
     type: str
     difficulty: str
     question_text: str
-    options: Optional[List[str]] = None
+    options: Optional[Dict[str, str]] = None  # keyed by option letter, "A"-"D"
     correct_answer: str
     explanation: Optional[str] = None
     quality_score: float
@@ -138,27 +161,22 @@ async def generate_questions_v1(request: QuestionRequest):
     """Generate quiz questions from text using OpenRouter API (versioned endpoint)"""
     return await _generate_questions_internal(request)
 
-@app.post("/generate-questions", response_model=QuestionResponse)
+@app.post(
+    "/generate-questions",
+    response_class=ORJSONResponse,
+    responses={200: {"model": QuestionResponse}},
+)
 async def generate_questions(request: QuestionRequest):
     """Generate quiz questions from text using OpenRouter API"""
     start_time = time.time()
     result = await _generate_questions_internal(request)
     processing_time = time.time() - start_time
     
-    # Convert to original response format
-    questions = []
-    for q in result.questions:
-        questions.append(Question(
-            type=q.get("type", "multiple_choice"),
-            difficulty=q.get("difficulty", request.difficulty),
-            question_text=q.get("question_text", ""),
-            options=q.get("options"),
-            correct_answer=q.get("correct_answer", ""),
-            explanation=q.get("explanation"),
-            quality_score=q.get("quality_score", 0.7)
-        ))
+    # Convert to original response format; the dicts are serialized directly,
+    # skipping a second Pydantic validation pass over the parsed questions
+    questions = _build_questions(result.questions, request.difficulty)
     
-    return QuestionResponse(questions=questions, processing_time=processing_time)
+    return ORJSONResponse({"questions": questions, "processing_time": processing_time})
 
 async def _generate_questions_internal(request: QuestionRequest) -> GenerateQuestionsResponse:
     """Internal function to generate questions"""
@@ -190,13 +208,6 @@ async def _generate_questions_internal(request: QuestionRequest) -> GenerateQues
         """
         
         # Call OpenRouter API
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": os.getenv("FRONTEND_URL", "http://localhost:5173"),
-            "X-Title": "QuizGenius"
-        }
-        
         payload = {
             "model": OPENROUTER_MODEL,
             "messages": [
@@ -214,31 +225,21 @@ async def _generate_questions_internal(request: QuestionRequest) -> GenerateQues
         }
         
         async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(OPENROUTER_API_URL, headers=headers, json=payload)
+            response = await client.post(OPENROUTER_API_URL, headers=BASE_HEADERS, json=payload)
             response.raise_for_status()
             result = response.json()
         
         # Parse response
         content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
         
-        # Try to extract JSON from response
-        try:
-            # Find JSON array in response
-            start_idx = content.find('[')
-            end_idx = content.rfind(']') + 1
-            if start_idx != -1 and end_idx != 0:
-                json_str = content[start_idx:end_idx]
-                questions_data = json.loads(json_str)
-            else:
-                # Fallback: create sample questions
-                questions_data = create_sample_questions(request.count, request.difficulty)
-        except json.JSONDecodeError:
-            # Fallback to sample questions if parsing fails
-            questions_data = create_sample_questions(request.count, request.difficulty)
+        # Extract and parse JSON in a worker thread so large replies don't block the loop
+        questions_data = await asyncio.get_running_loop().run_in_executor(
+            None, _parse_questions, content, request.count, request.difficulty
+        )
         
         return GenerateQuestionsResponse(
             success=True,
-            questions=questions_data[:request.count]
+            questions=questions_data
         )
         
     except httpx.HTTPStatusError as e:
@@ -246,26 +247,71 @@ async def _generate_questions_internal(request: QuestionRequest) -> GenerateQues
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
+def _build_questions(questions_data: List[dict], difficulty: Optional[str]) -> List[dict]:
+    """Normalize raw question dicts to the Question response shape"""
+    return [
+        {
+            "type": q.get("type", "multiple_choice"),
+            "difficulty": q.get("difficulty", difficulty),
+            "question_text": q.get("question_text", ""),
+            "options": q.get("options"),
+            "correct_answer": q.get("correct_answer", ""),
+            "explanation": q.get("explanation"),
+            "quality_score": q.get("quality_score", 0.7)
+        }
+        for q in questions_data
+    ]
+
+def _parse_questions(content: str, count: int, difficulty: Optional[str]) -> List[dict]:
+    """Extract the question array from an LLM reply, falling back to sample questions"""
+    questions_data = _extract_question_array(content)
+    if questions_data is None:
+        # Fallback: create sample questions
+        questions_data = create_sample_questions(count, difficulty)
+    
+    return questions_data[:count]
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_question_array(s: str) -> Optional[List[dict]]:
+    """Return the first non-empty JSON array of objects in s, or None if there is none"""
+    start = s.find('[')
+    while start != -1:
+        # raw_decode parses one value from start and ignores any trailing prose
+        try:
+            value, _ = _JSON_DECODER.raw_decode(s, start)
+        except ValueError:
+            value = None
+        if value and isinstance(value, list) and all(isinstance(q, dict) for q in value):
+            return value
+        start = s.find('[', start + 1)
+    return None
+
+# Static fields shared by every fallback question
+_SAMPLE_QUESTION_TEMPLATE = {
+    "type": "multiple_choice",
+    "correct_option": "A",
+    "explanation": "This is a sample explanation for the correct answer.",
+    "page_reference": 1,
+    "quality_score": 0.6
+}
+
 def create_sample_questions(count: int, difficulty: str) -> List[dict]:
     """Create sample questions as fallback"""
-    questions = []
-    for i in range(count):
-        questions.append({
-            "type": "multiple_choice",
+    return [
+        {
+            **_SAMPLE_QUESTION_TEMPLATE,
             "difficulty": difficulty,
-            "question_text": f"Sample question {i + 1} about the content?",
+            "question_text": f"Sample question {i} about the content?",
             "options": {
-                "A": f"Option A for question {i + 1}",
-                "B": f"Option B for question {i + 1}",
-                "C": f"Option C for question {i + 1}",
-                "D": f"Option D for question {i + 1}"
+                "A": f"Option A for question {i}",
+                "B": f"Option B for question {i}",
+                "C": f"Option C for question {i}",
+                "D": f"Option D for question {i}"
             },
-            "correct_option": "A",
-            "explanation": "This is a sample explanation for the correct answer.",
-            "page_reference": 1,
-            "quality_score": 0.6
-        })
-    return questions
+        }
+        for i in range(1, count + 1)
+    ]
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,25 +1,101 @@
 """
 Pytest configuration and fixtures for NLP Service tests
 """
+import sys
+from collections import deque
+from functools import cache
+from pathlib import Path
+from types import MappingProxyType
+from unittest.mock import MagicMock
+
+import fitz
+import httpx
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
-from fastapi.testclient import TestClient
+import pytest_asyncio
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
 
-from app.main import app
 from app.config import Settings
-from app.models.question import DifficultyLevel, GeneratedQuestion, QuestionOption
 from app.models.pdf import TextChunk
+from app.models.question import DifficultyLevel, GeneratedQuestion, QuestionOption
+from app.services.llm_client import OllamaClient
+from app.services.question_generator import QuestionGenerator
+from app.services.question_validator import QuestionValidator
+from app.services.text_chunker import TextChunker
+from app.utils.cache import RedisCache
 
+# Canned payloads shared by the session fixtures below. The top-level mapping
+# is read-only; nested lists stay lists because the validator type-checks them.
+_SAMPLE_QUESTION_DATA = MappingProxyType({
+    "questionText": "What is the primary function of mitochondria in a cell?",
+    "options": [
+        {"id": "A", "text": "Protein synthesis"},
+        {"id": "B", "text": "ATP production"},
+        {"id": "C", "text": "Cell division"},
+        {"id": "D", "text": "DNA replication"},
+    ],
+    "correctAnswer": "B",
+    "explanation": "Mitochondria are known as the powerhouse of the cell because they produce ATP through cellular respiration.",
+    "difficulty": "easy",
+})
 
-@pytest.fixture
+_MOCK_LLM_RESPONSE = MappingProxyType({
+    "response": {
+        "questions": [
+            {
+                "questionText": "What is the primary function of mitochondria?",
+                "options": [
+                    {"id": "A", "text": "Protein synthesis"},
+                    {"id": "B", "text": "ATP production"},
+                    {"id": "C", "text": "Cell division"},
+                    {"id": "D", "text": "DNA replication"},
+                ],
+                "correctAnswer": "B",
+                "explanation": "Mitochondria produce ATP through cellular respiration.",
+                "difficulty": "medium",
+            }
+        ]
+    },
+    "raw_response": '{"questions": [...]}',
+    "model": "mistral:7b-instruct-q4_K_M",
+    "elapsed_ms": 1500,
+})
+
+
+if uvloop is not None:
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run async tests on uvloop, the loop uvicorn uses in production."""
+        return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+    """Create a test client for the FastAPI app, shared across the session."""
+    # Imported here so non-API test runs don't pay for wiring the app
+    from fastapi.testclient import TestClient
 
+    from app.main import app
+    
+    with TestClient(app) as c:
+        yield c
 
-@pytest.fixture
+
+@pytest.fixture(autouse=True)
+def _reset_dependency_overrides():
+    """Clear dependency overrides so the shared client doesn't leak state between tests."""
+    yield
+    main = sys.modules.get("app.main")
+    if main is not None:
+        main.app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
 def mock_settings():
-    """Create mock settings for testing."""
+    """Test settings, built once per session; treat as read-only."""
     return Settings(
         service_name="nlp-service-test",
         debug=True,
@@ -33,7 +109,11 @@ def mock_settings():
     )
 
 
-@pytest.fixture
+# Data fixtures below are session-scoped and shared across tests.
+# Tests must treat them as read-only and copy before mutating.
+
+
+@pytest.fixture(scope="session")
 def sample_text():
     """Sample text for testing."""
     return """
@@ -54,7 +134,7 @@ def sample_text():
     """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def long_sample_text():
     """Longer sample text for chunking tests."""
     base_text = """
@@ -76,24 +156,13 @@ def long_sample_text():
     return base_text * 10
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_question_data():
     """Sample question data as returned by LLM."""
-    return {
-        "questionText": "What is the primary function of mitochondria in a cell?",
-        "options": [
-            {"id": "A", "text": "Protein synthesis"},
-            {"id": "B", "text": "ATP production"},
-            {"id": "C", "text": "Cell division"},
-            {"id": "D", "text": "DNA replication"},
-        ],
-        "correctAnswer": "B",
-        "explanation": "Mitochondria are known as the powerhouse of the cell because they produce ATP through cellular respiration.",
-        "difficulty": "easy",
-    }
+    return _SAMPLE_QUESTION_DATA
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_generated_question():
     """Sample GeneratedQuestion object."""
     return GeneratedQuestion(
@@ -112,7 +181,7 @@ def sample_generated_question():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_chunk():
     """Sample TextChunk object."""
     return TextChunk(
@@ -129,6 +198,39 @@ def sample_chunk():
     )
 
 
+@cache
+def load_bytes_fixture(path: str) -> bytes:
+    """Read a fixture file once per session; later calls hit the cache."""
+    return Path(path).read_bytes()
+
+
+@pytest.fixture(scope="session")
+def sample_pdf_path(tmp_path_factory, sample_text):
+    """Small text PDF generated once per session."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(72, 72, 540, 720), " ".join(sample_text.split()))
+    
+    path = tmp_path_factory.mktemp("pdfs") / "sample.pdf"
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+@pytest.fixture(scope="session")
+def sample_pdf_bytes(sample_pdf_path):
+    """Bytes of the generated sample PDF."""
+    return load_bytes_fixture(str(sample_pdf_path))
+
+
+@pytest.fixture(scope="session")
+def not_pdf_file(tmp_path_factory):
+    """Plain text file with a non-PDF suffix, written once per session."""
+    path = tmp_path_factory.mktemp("files") / "test.txt"
+    path.write_text("Not a PDF")
+    return path
+
+
 @pytest.fixture
 def mock_redis():
     """Mock Redis client."""
@@ -139,42 +241,141 @@ def mock_redis():
     return mock
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_llm_response():
     """Mock LLM response for question generation."""
-    return {
-        "response": {
-            "questions": [
-                {
-                    "questionText": "What is the primary function of mitochondria?",
-                    "options": [
-                        {"id": "A", "text": "Protein synthesis"},
-                        {"id": "B", "text": "ATP production"},
-                        {"id": "C", "text": "Cell division"},
-                        {"id": "D", "text": "DNA replication"},
-                    ],
-                    "correctAnswer": "B",
-                    "explanation": "Mitochondria produce ATP through cellular respiration.",
-                    "difficulty": "medium",
-                }
-            ]
-        },
-        "raw_response": '{"questions": [...]}',
-        "model": "mistral:7b-instruct-q4_K_M",
-        "elapsed_ms": 1500,
-    }
+    return _MOCK_LLM_RESPONSE
 
 
-@pytest.fixture
-def mock_ollama_client(mock_llm_response):
-    """Mock Ollama client."""
-    mock = AsyncMock()
-    mock.generate.return_value = mock_llm_response
-    mock.generate_questions.return_value = mock_llm_response
-    mock.check_health.return_value = {
+@pytest.fixture(scope="session")
+def mock_health_response():
+    """Mock Ollama health check response."""
+    return {
         "healthy": True,
         "models": ["mistral:7b-instruct-q4_K_M"],
         "model_available": True,
     }
-    mock.close = AsyncMock()
-    return mock
+
+
+class _StubLLM:
+    """
+    Stand-in for OllamaClient that replays canned responses and records calls.
+    
+    Each generate/generate_questions call consumes the next response; the last
+    one is reused once the list runs out. Exception instances are raised.
+    """
+    
+    def __init__(self, responses, health: dict | None = None):
+        self._responses = list(responses)
+        self._health = health
+        self.calls: list[tuple[str, tuple, dict]] = []
+        self.closed = False
+    
+    @property
+    def call_count(self) -> int:
+        return len(self.calls)
+    
+    def _next(self, name: str, args: tuple, kwargs: dict):
+        self.calls.append((name, args, kwargs))
+        response = self._responses[min(len(self.calls), len(self._responses)) - 1]
+        if isinstance(response, BaseException):
+            raise response
+        return response
+    
+    async def generate(self, *args, **kwargs) -> dict:
+        return self._next("generate", args, kwargs)
+    
+    async def generate_questions(self, *args, **kwargs) -> dict:
+        return self._next("generate_questions", args, kwargs)
+    
+    async def check_health(self) -> dict:
+        return self._health
+    
+    async def close(self) -> None:
+        self.closed = True
+
+
+def make_stub_llm(responses, health: dict | None = None) -> _StubLLM:
+    """Build a stub LLM client that replays ``responses`` in order."""
+    return _StubLLM(responses, health)
+
+
+@pytest.fixture(scope="session")
+def make_llm():
+    """Factory for stub LLM clients that replay canned responses."""
+    return make_stub_llm
+
+
+@pytest.fixture
+def mock_ollama_client(mock_llm_response, mock_health_response):
+    """Stub Ollama client returning the canned LLM and health responses."""
+    return make_stub_llm([mock_llm_response], mock_health_response)
+
+
+# Service fixtures are built once per session. They hold no per-request
+# state, so tests swap collaborators with monkeypatch instead of rebuilding.
+
+
+@pytest.fixture(scope="session")
+def validator():
+    """Shared QuestionValidator instance."""
+    return QuestionValidator()
+
+
+@pytest.fixture(scope="session")
+def generator(validator):
+    """
+    Shared QuestionGenerator instance.
+    
+    Wired to an empty stub LLM and an unconnected cache; tests monkeypatch
+    ``llm_client``/``cache``/``chunker`` with their own collaborators.
+    """
+    return QuestionGenerator(
+        chunker=TextChunker(),
+        llm_client=make_stub_llm([]),
+        validator=validator,
+        cache=RedisCache(),
+    )
+
+
+@pytest_asyncio.fixture
+async def make_client():
+    """Factory for OllamaClient instances, all closed at teardown."""
+    created: list[OllamaClient] = []
+    
+    def _make(**kwargs) -> OllamaClient:
+        client = OllamaClient(**kwargs)
+        created.append(client)
+        return client
+    
+    yield _make
+    
+    for client in created:
+        await client.close()
+
+
+@pytest_asyncio.fixture
+async def ollama_client():
+    """
+    OllamaClient whose HTTP calls go through an httpx.MockTransport.
+    
+    Yields a (client, handlers) tuple. Tests append handlers that take an
+    httpx.Request and return an httpx.Response (or raise). Each request
+    consumes the next handler; the last one is reused once the queue drains.
+    The client is closed at teardown, even if the test fails.
+    """
+    handlers: deque = deque()
+    
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        handler = handlers.popleft() if len(handlers) > 1 else handlers[0]
+        return handler(request)
+    
+    client = OllamaClient()
+    client._client = httpx.AsyncClient(
+        base_url=client.base_url,
+        transport=httpx.MockTransport(dispatch),
+    )
+    try:
+        yield client, handlers
+    finally:
+        await client.close()
@@ -1,28 +1,81 @@
 """
 Tests for Ollama LLM Client
 """
+import json
+
+import orjson
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 
 from app.services.llm_client import OllamaClient
 from app.utils.errors import LLMTimeoutError, LLMConnectionError, LLMResponseError, JSONParseError
 
 
+# Recorded Ollama replies, replayed through the mock transport by name
+OLLAMA_REPLIES = {
+    "tags": {
+        "models": [
+            {"name": "mistral:7b-instruct-q4_K_M"},
+            {"name": "llama2:7b"},
+        ]
+    },
+    "generate_questions": {
+        "response": orjson.dumps({"questions": []}).decode(),
+        "model": "mistral",
+        "total_duration": 1000,
+    },
+    "generate_result": {
+        "response": orjson.dumps({"result": "success"}).decode(),
+        "model": "mistral",
+    },
+    "generate_invalid_json": {
+        "response": "not valid json {",
+        "model": "mistral",
+    },
+    "generate_empty": {
+        "response": "",
+        "model": "mistral",
+    },
+}
+
+# Reply bodies serialized once at import rather than on every request
+_REPLY_BODIES = {name: orjson.dumps(reply) for name, reply in OLLAMA_REPLIES.items()}
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def replay(name: str):
+    """Build a transport handler that replays a recorded Ollama reply."""
+    body = _REPLY_BODIES[name]
+    return lambda request: httpx.Response(200, content=body, headers=_JSON_HEADERS)
+
+
+def _timeout(request):
+    raise httpx.TimeoutException("Timeout")
+
+
+@pytest.fixture(autouse=True)
+def _fast_sleep(monkeypatch):
+    """Skip the real retry back-off sleeps."""
+    async def _noop(_delay):
+        return None
+    
+    monkeypatch.setattr("app.services.llm_client.asyncio.sleep", _noop)
+
+
 class TestOllamaClient:
     """Tests for OllamaClient class."""
     
-    def test_init_default_settings(self):
+    def test_init_default_settings(self, make_client):
         """Test client initializes with default settings."""
-        client = OllamaClient()
+        client = make_client()
         
         assert "localhost:11434" in client.base_url
         assert client.model is not None
         assert client.timeout > 0
     
-    def test_init_custom_settings(self):
+    def test_init_custom_settings(self, make_client):
         """Test client initializes with custom settings."""
-        client = OllamaClient(
+        client = make_client(
             base_url="http://custom:8080",
             model="custom-model",
             timeout=60,
@@ -32,10 +85,9 @@ class TestOllamaClient:
         assert client.model == "custom-model"
         assert client.timeout == 60
     
-    @pytest.mark.asyncio
-    async def test_close_client(self):
+    async def test_close_client(self, make_client):
         """Test client closes properly."""
-        client = OllamaClient()
+        client = make_client()
         
         # Access client to create it
         _ = client.client
@@ -50,181 +102,165 @@ class TestOllamaClient:
 class TestOllamaClientHealthCheck:
     """Tests for health check functionality."""
     
-    @pytest.mark.asyncio
-    async def test_check_health_success(self):
+    async def test_check_health_success(self, ollama_client):
         """Test health check when Ollama is healthy."""
-        client = OllamaClient()
-        
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "models": [
-                {"name": "mistral:7b-instruct-q4_K_M"},
-                {"name": "llama2:7b"},
-            ]
-        }
-        mock_response.raise_for_status = MagicMock()
-        
-        with patch.object(client.client, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
-            
-            result = await client.check_health()
+        client, handlers = ollama_client
+        
+        handlers.append(replay("tags"))
+        
+        result = await client.check_health()
         
         assert result["healthy"] is True
         assert len(result["models"]) == 2
-        await client.close()
     
-    @pytest.mark.asyncio
-    async def test_check_health_connection_error(self):
+    async def test_check_health_connection_error(self, ollama_client):
         """Test health check when Ollama is unreachable."""
-        client = OllamaClient()
+        client, handlers = ollama_client
+        
+        def refuse(request):
+            raise httpx.ConnectError("Connection refused")
+        handlers.append(refuse)
         
-        with patch.object(client.client, 'get', new_callable=AsyncMock) as mock_get:
-            mock_get.side_effect = httpx.ConnectError("Connection refused")
-            
-            result = await client.check_health()
+        result = await client.check_health()
         
         assert result["healthy"] is False
         assert "error" in result
-        await client.close()
 
 
 class TestOllamaClientGenerate:
     """Tests for generate functionality."""
     
-    @pytest.mark.asyncio
-    async def test_generate_success(self, mock_llm_response):
+    async def test_generate_success(self, ollama_client):
         """Test successful generation."""
-        client = OllamaClient()
-        
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "response": '{"questions": []}',
-            "model": "mistral",
-            "total_duration": 1000,
-        }
-        mock_response.raise_for_status = MagicMock()
-        
-        with patch.object(client.client, 'post', new_callable=AsyncMock) as mock_post:
-            mock_post.return_value = mock_response
-            
-            result = await client.generate(
-                prompt="Generate a question",
-                system_prompt="You are helpful",
-            )
+        client, handlers = ollama_client
+        
+        handlers.append(replay("generate_questions"))
+        
+        result = await client.generate(
+            prompt="Generate a question",
+            system_prompt="You are helpful",
+        )
         
         assert "response" in result
         assert "elapsed_ms" in result
-        await client.close()
     
-    @pytest.mark.asyncio
-    async def test_generate_timeout(self):
-        """Test generation timeout handling."""
-        client = OllamaClient(timeout=1)
+    async def test_generate_questions_single_call(self, ollama_client):
+        """Test all questions are requested in one call with room for them."""
+        client, handlers = ollama_client
         
-        with patch.object(client.client, 'post', new_callable=AsyncMock) as mock_post:
-            mock_post.side_effect = httpx.TimeoutException("Timeout")
-            
-            with pytest.raises(LLMTimeoutError):
-                await client.generate(prompt="Test")
+        payloads = []
         
-        await client.close()
+        def capture(request):
+            payloads.append(json.loads(request.content))
+            return replay("generate_questions")(request)
+        handlers.append(capture)
+        
+        await client.generate_questions(
+            text_chunk="Some text",
+            system_prompt="System",
+            user_prompt="Generate 5 questions",
+            count=5,
+        )
+        
+        assert len(payloads) == 1
+        assert payloads[0]["options"]["num_predict"] >= 5 * client.TOKENS_PER_QUESTION
+    
+    async def test_generate_timeout(self, ollama_client):
+        """Test generation timeout handling."""
+        client, handlers = ollama_client
+        handlers.append(_timeout)
+        
+        with pytest.raises(LLMTimeoutError):
+            await client.generate(prompt="Test")
     
-    @pytest.mark.asyncio
-    async def test_generate_connection_error(self):
+    async def test_generate_connection_error(self, ollama_client):
         """Test generation connection error handling."""
-        client = OllamaClient()
+        client, handlers = ollama_client
         
-        with patch.object(client.client, 'post', new_callable=AsyncMock) as mock_post:
-            mock_post.side_effect = httpx.ConnectError("Connection refused")
-            
-            with pytest.raises(LLMConnectionError):
-                await client.generate(prompt="Test")
+        def refuse(request):
+            raise httpx.ConnectError("Connection refused")
+        handlers.append(refuse)
         
-        await client.close()
+        with pytest.raises(LLMConnectionError):
+            await client.generate(prompt="Test")
     
-    @pytest.mark.asyncio
-    async def test_generate_invalid_json_response(self):
+    async def test_generate_invalid_json_response(self, ollama_client):
         """Test handling of invalid JSON response."""
-        client = OllamaClient()
+        client, handlers = ollama_client
         
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "response": "not valid json {",
-            "model": "mistral",
-        }
-        mock_response.raise_for_status = MagicMock()
+        handlers.append(replay("generate_invalid_json"))
         
-        with patch.object(client.client, 'post', new_callable=AsyncMock) as mock_post:
-            mock_post.return_value = mock_response
-            
-            with pytest.raises(JSONParseError):
-                await client.generate(prompt="Test", json_mode=True)
-        
-        await client.close()
+        with pytest.raises(JSONParseError):
+            await client.generate(prompt="Test", json_mode=True)
     
-    @pytest.mark.asyncio
-    async def test_generate_empty_response(self):
+    async def test_generate_empty_response(self, ollama_client):
         """Test handling of empty response."""
-        client = OllamaClient()
-        
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "response": "",
-            "model": "mistral",
-        }
-        mock_response.raise_for_status = MagicMock()
+        client, handlers = ollama_client
         
-        with patch.object(client.client, 'post', new_callable=AsyncMock) as mock_post:
-            mock_post.return_value = mock_response
-            
-            with pytest.raises(LLMResponseError):
-                await client.generate(prompt="Test")
+        handlers.append(replay("generate_empty"))
         
-        await client.close()
+        with pytest.raises(LLMResponseError):
+            await client.generate(prompt="Test")
 
 
 class TestOllamaClientRetry:
     """Tests for retry logic."""
     
-    @pytest.mark.asyncio
-    async def test_retry_on_timeout(self):
+    @pytest.fixture(autouse=True, scope="class")
+    def _no_backoff(self):
+        """Zero the back-off schedule while keeping the number of attempts."""
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(OllamaClient, "RETRY_DELAYS", [0] * len(OllamaClient.RETRY_DELAYS))
+            yield
+    
+    async def test_retry_on_timeout(self, ollama_client):
         """Test that client retries on timeout."""
-        client = OllamaClient()
+        client, handlers = ollama_client
         
         # First two calls timeout, third succeeds
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "response": '{"result": "success"}',
-            "model": "mistral",
-        }
-        mock_response.raise_for_status = MagicMock()
-        
-        call_count = 0
-        async def mock_post(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count < 3:
-                raise httpx.TimeoutException("Timeout")
-            return mock_response
-        
-        with patch.object(client.client, 'post', side_effect=mock_post):
-            with patch('asyncio.sleep', new_callable=AsyncMock):
-                result = await client.generate(prompt="Test")
-        
-        assert call_count == 3
+        requests: list[httpx.Request] = []
+        
+        def record(handler):
+            def wrapper(request):
+                requests.append(request)
+                return handler(request)
+            return wrapper
+        
+        handlers.extend([
+            record(_timeout),
+            record(_timeout),
+            record(replay("generate_result")),
+        ])
+        
+        result = await client.generate(prompt="Test")
+        
+        assert len(requests) == 3
         assert "response" in result
-        await client.close()
     
-    @pytest.mark.asyncio
-    async def test_retry_exhausted(self):
+    async def test_retry_exhausted(self, ollama_client):
         """Test that error is raised after retries exhausted."""
-        client = OllamaClient()
+        client, handlers = ollama_client
+        handlers.append(_timeout)
         
-        with patch.object(client.client, 'post', new_callable=AsyncMock) as mock_post:
-            mock_post.side_effect = httpx.TimeoutException("Timeout")
-            
-            with patch('asyncio.sleep', new_callable=AsyncMock):
-                with pytest.raises(LLMTimeoutError):
-                    await client.generate(prompt="Test")
+        with pytest.raises(LLMTimeoutError):
+            await client.generate(prompt="Test")
+    
+    async def test_retry_backoff_is_jittered(self, ollama_client, monkeypatch):
+        """Test that retry delays are spread around the exponential schedule."""
+        client, handlers = ollama_client
+        handlers.append(_timeout)
         
-        await client.close()
+        delays: list[float] = []
+        
+        async def record_sleep(delay):
+            delays.append(delay)
+        
+        monkeypatch.setattr(OllamaClient, "RETRY_DELAYS", [2, 4, 8])
+        monkeypatch.setattr("app.services.llm_client.asyncio.sleep", record_sleep)
+        
+        with pytest.raises(LLMTimeoutError):
+            await client.generate(prompt="Test")
+        
+        assert len(delays) == 3
+        for delay, base in zip(delays, [2, 4, 8]):
+            assert base * 0.5 <= delay <= base * 1.5
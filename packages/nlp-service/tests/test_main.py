@@ -0,0 +1,61 @@
+"""
+Tests for the standalone OpenRouter service (main.py)
+"""
+import json
+
+from main import QuestionResponse, _build_questions, _parse_questions, create_sample_questions
+
+
+QUESTION = {
+    "type": "multiple_choice",
+    "question_text": "Which list holds [brackets] in its text?",
+    "options": {"A": "This one", "B": "That one", "C": "Neither", "D": "Both"},
+    "correct_option": "A",
+}
+
+
+class TestParseQuestions:
+    """Tests for extracting the question array from an LLM reply."""
+    
+    def test_parse_bare_array(self):
+        """Test a reply that is just the JSON array."""
+        questions = _parse_questions(json.dumps([QUESTION]), count=5, difficulty="easy")
+        
+        assert questions == [QUESTION]
+    
+    def test_parse_skips_bracket_in_prose(self):
+        """Test a bracketed number in the prose before the array is skipped."""
+        content = f"Here are [3] items: {json.dumps([QUESTION] * 3)} Hope this helps!"
+        
+        questions = _parse_questions(content, count=5, difficulty="easy")
+        
+        assert questions == [QUESTION] * 3
+    
+    def test_parse_truncates_to_count(self):
+        """Test extra questions beyond the requested count are dropped."""
+        questions = _parse_questions(json.dumps([QUESTION] * 4), count=2, difficulty="easy")
+        
+        assert len(questions) == 2
+    
+    def test_parse_falls_back_without_valid_array(self):
+        """Test a reply without a usable array yields sample questions."""
+        content = 'Sorry, I cannot do that [1, 2] [{"question_text": "unterminated'
+        
+        questions = _parse_questions(content, count=5, difficulty="hard")
+        
+        assert len(questions) == 5
+        assert all(q["question_text"].startswith("Sample question") for q in questions)
+        assert all(q["difficulty"] == "hard" for q in questions)
+
+
+class TestQuestionResponse:
+    """Tests for the documented /generate-questions response shape."""
+    
+    def test_built_questions_match_response_model(self):
+        """Test the payload the route returns validates against QuestionResponse."""
+        questions = _build_questions(create_sample_questions(5, "easy") + [QUESTION], "easy")
+        
+        response = QuestionResponse.model_validate({"questions": questions, "processing_time": 0.5})
+        
+        assert len(response.questions) == 6
+        assert response.questions[0].options["A"] == "Option A for question 1"
@@ -4,12 +4,51 @@ Tests for PDF Extractor service
 import pytest
 from io import BytesIO
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 from app.services.pdf_extractor import PDFExtractor
 from app.utils.errors import PDFExtractionError, OCRRequiredError
 
 
+def fake_page(text, images=()):
+    """Cheap stand-in for a fitz page; only get_text/get_images are called."""
+    return SimpleNamespace(
+        get_text=lambda *args, **kwargs: text,
+        get_images=lambda *args, **kwargs: list(images),
+    )
+
+
+@pytest.fixture(scope="module")
+def make_fitz_doc():
+    """Factory building a mocked fitz document from per-page text."""
+    def _make(pages_text, images_per_page=(), metadata=None):
+        pages = [
+            fake_page(text, images_per_page[i] if i < len(images_per_page) else [])
+            for i, text in enumerate(pages_text)
+        ]
+        
+        doc = MagicMock()
+        doc.__len__.return_value = len(pages)
+        doc.__getitem__.side_effect = lambda idx: pages[idx]
+        doc.metadata = metadata or {}
+        return doc
+    
+    return _make
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    """PDFExtractor with header/footer filtering, shared across the module."""
+    return PDFExtractor()
+
+
+@pytest.fixture(scope="module")
+def extractor_no_filter():
+    """PDFExtractor without header/footer filtering."""
+    return PDFExtractor(filter_headers_footers=False)
+
+
 class TestPDFExtractor:
     """Tests for PDFExtractor class."""
     
@@ -23,86 +62,77 @@ class TestPDFExtractor:
         extractor = PDFExtractor(filter_headers_footers=False)
         assert extractor.filter_headers_footers is False
     
-    def test_extract_from_path_file_not_found(self):
+    def test_extract_from_path_file_not_found(self, extractor):
         """Test error when file doesn't exist."""
-        extractor = PDFExtractor()
-        
         with pytest.raises(PDFExtractionError) as exc_info:
             extractor.extract_from_path("/nonexistent/file.pdf")
         
         assert "File not found" in str(exc_info.value.message)
     
-    def test_extract_from_path_not_pdf(self, tmp_path):
+    def test_extract_from_path_not_pdf(self, extractor, not_pdf_file):
         """Test error when file is not a PDF."""
-        # Create a non-PDF file
-        txt_file = tmp_path / "test.txt"
-        txt_file.write_text("Not a PDF")
-        
-        extractor = PDFExtractor()
-        
         with pytest.raises(PDFExtractionError) as exc_info:
-            extractor.extract_from_path(str(txt_file))
+            extractor.extract_from_path(str(not_pdf_file))
         
         assert "Not a PDF file" in str(exc_info.value.message)
     
-    def test_is_header_footer_page_number(self):
-        """Test header/footer detection for page numbers."""
-        extractor = PDFExtractor()
+    def test_extract_from_path_success(self, extractor, sample_pdf_path):
+        """Test extraction from a real PDF on disk."""
+        result = extractor.extract_from_path(sample_pdf_path)
         
-        # Page numbers at the end should be detected
-        assert extractor._is_header_footer("42", 98, 100) is True
-        assert extractor._is_header_footer("Page 5", 99, 100) is True
-        
-        # Content in the middle should not be detected
-        assert extractor._is_header_footer("42", 50, 100) is False
+        assert result.success is True
+        assert result.metadata.page_count == 1
+        assert "Mitochondria" in result.text
     
-    def test_is_header_footer_patterns(self):
-        """Test header/footer detection for common patterns."""
-        extractor = PDFExtractor()
+    def test_extract_from_bytes_real_pdf(self, extractor, sample_pdf_bytes):
+        """Test extraction from real PDF bytes."""
+        result = extractor.extract_from_bytes(sample_pdf_bytes, filename="sample.pdf")
         
+        assert result.metadata.filename == "sample.pdf"
+        assert result.metadata.file_size_bytes == len(sample_pdf_bytes)
+        assert result.metadata.word_count > 0
+    
+    @pytest.mark.parametrize("line,idx,total,expected", [
+        # Page numbers at the end should be detected
+        ("42", 98, 100, True),
+        ("Page 5", 99, 100, True),
+        # Content in the middle should not be detected
+        ("42", 50, 100, False),
         # Common header/footer patterns at edges
-        assert extractor._is_header_footer("Chapter 1", 0, 50) is True
-        assert extractor._is_header_footer("© 2024 Company", 48, 50) is True
-        assert extractor._is_header_footer("All Rights Reserved", 49, 50) is True
-        
+        ("Chapter 1", 0, 50, True),
+        ("© 2024 Company", 48, 50, True),
+        ("All Rights Reserved", 49, 50, True),
         # Same content in middle shouldn't match
-        assert extractor._is_header_footer("© 2024 Company", 25, 50) is False
+        ("© 2024 Company", 25, 50, False),
+    ])
+    def test_is_header_footer(self, extractor, line, idx, total, expected):
+        """Test header/footer detection by line content and position."""
+        assert extractor._is_header_footer(line, idx, total) is expected
     
-    def test_normalize_text(self):
+    @pytest.mark.parametrize("text,expected", [
+        # Multiple newlines collapse to a paragraph break
+        ("Line 1\n\n\n\nLine 2", "Line 1\n\nLine 2"),
+        # Multiple spaces collapse to one
+        ("Word    another    word", "Word another word"),
+        # Hyphenated words split across lines are rejoined
+        ("hyphen-\nated", "hyphenated"),
+    ])
+    def test_normalize_text(self, extractor, text, expected):
         """Test text normalization."""
-        extractor = PDFExtractor()
-        
-        # Test multiple newlines
-        text = "Line 1\n\n\n\nLine 2"
-        normalized = extractor._normalize_text(text)
-        assert "\n\n\n" not in normalized
-        
-        # Test multiple spaces
-        text = "Word    another    word"
-        normalized = extractor._normalize_text(text)
-        assert "    " not in normalized
-        
-        # Test hyphenated words
-        text = "hyphen-\nated"
-        normalized = extractor._normalize_text(text)
-        assert "hyphenated" in normalized
+        assert extractor._normalize_text(text) == expected
     
-    def test_clean_page_text_empty(self):
+    def test_clean_page_text_empty(self, extractor):
         """Test cleaning empty page text."""
-        extractor = PDFExtractor()
-        
         result = extractor._clean_page_text("", 0)
         assert result == ""
         
         result = extractor._clean_page_text("   \n  \n  ", 0)
         assert result == ""
     
-    def test_clean_page_text_with_content(self):
+    def test_clean_page_text_with_content(self, extractor_no_filter):
         """Test cleaning page text preserves content."""
-        extractor = PDFExtractor(filter_headers_footers=False)
-        
         text = "Line 1\nLine 2\nLine 3"
-        result = extractor._clean_page_text(text, 0)
+        result = extractor_no_filter._clean_page_text(text, 0)
         
         assert "Line 1" in result
         assert "Line 2" in result
@@ -112,30 +142,24 @@ class TestPDFExtractor:
 class TestPDFExtractorWithMocks:
     """Tests for PDF extraction using mocked PDF content."""
     
-    @patch('app.services.pdf_extractor.fitz')
-    def test_extract_from_bytes_success(self, mock_fitz):
+    @pytest.fixture
+    def mock_fitz(self, mocker):
+        """Patch the fitz module used by the extractor."""
+        return mocker.patch('app.services.pdf_extractor.fitz')
+    
+    def test_extract_from_bytes_success(self, mock_fitz, make_fitz_doc, extractor):
         """Test successful extraction from bytes."""
-        # Setup mock document
-        mock_doc = MagicMock()
-        mock_doc.__len__ = MagicMock(return_value=2)
-        mock_doc.metadata = {"title": "Test Doc", "author": "Test Author"}
-        
-        # Setup mock pages
-        mock_page1 = MagicMock()
-        mock_page1.get_text.return_value = "Page 1 content with some text."
-        mock_page1.get_images.return_value = []
-        
-        mock_page2 = MagicMock()
-        mock_page2.get_text.return_value = "Page 2 content with more text."
-        mock_page2.get_images.return_value = []
-        
-        mock_doc.__iter__ = MagicMock(return_value=iter([0, 1]))
-        mock_doc.__getitem__ = MagicMock(side_effect=[mock_page1, mock_page2])
-        
-        mock_fitz.open.return_value = mock_doc
+        # Pages need enough text to clear the scanned-PDF density check;
+        # the leading "Page N" line is dropped by the header/footer filter
+        mock_fitz.open.return_value = make_fitz_doc(
+            [
+                "Page 1\n" + "Body content with some text. " * 5,
+                "Page 2\n" + "Body content with more text. " * 5,
+            ],
+            metadata={"title": "Test Doc", "author": "Test Author"},
+        )
         
         # Run extraction
-        extractor = PDFExtractor()
         result = extractor.extract_from_bytes(
             content=b"fake pdf content",
             filename="test.pdf",
@@ -146,39 +170,24 @@ class TestPDFExtractorWithMocks:
         assert result.success is True
         assert result.metadata.filename == "test.pdf"
         assert result.metadata.page_count == 2
-        assert "Page 1 content" in result.text or len(result.text) > 0
+        assert "Body content" in result.text or len(result.text) > 0
     
-    @patch('app.services.pdf_extractor.fitz')
-    def test_extract_from_bytes_invalid_pdf(self, mock_fitz):
+    def test_extract_from_bytes_invalid_pdf(self, mock_fitz, extractor):
         """Test extraction fails for invalid PDF."""
         mock_fitz.open.side_effect = Exception("Invalid PDF")
         
-        extractor = PDFExtractor()
-        
         with pytest.raises(PDFExtractionError) as exc_info:
             extractor.extract_from_bytes(b"invalid content")
         
         assert "Failed to open PDF" in str(exc_info.value.message)
     
-    @patch('app.services.pdf_extractor.fitz')
-    def test_extract_detects_scanned_pdf(self, mock_fitz):
+    def test_extract_detects_scanned_pdf(self, mock_fitz, make_fitz_doc, extractor):
         """Test detection of scanned/image PDFs."""
-        # Setup mock document with very little text (scanned)
-        mock_doc = MagicMock()
-        mock_doc.__len__ = MagicMock(return_value=5)
-        mock_doc.metadata = {}
-        
-        # Pages with minimal text
-        mock_page = MagicMock()
-        mock_page.get_text.return_value = "a"  # Very little text
-        mock_page.get_images.return_value = [("img1",)]
-        
-        mock_doc.__iter__ = MagicMock(return_value=iter(range(5)))
-        mock_doc.__getitem__ = MagicMock(return_value=mock_page)
-        
-        mock_fitz.open.return_value = mock_doc
-        
-        extractor = PDFExtractor()
+        # Pages with minimal text (scanned)
+        mock_fitz.open.return_value = make_fitz_doc(
+            ["a"] * 5,
+            images_per_page=[[("img1",)]] * 5,
+        )
         
         with pytest.raises(OCRRequiredError) as exc_info:
             extractor.extract_from_bytes(b"scanned pdf")
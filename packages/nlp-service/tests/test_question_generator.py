@@ -1,505 +1,297 @@
 """
-Question Generator Service Unit Tests
-Comprehensive tests for question generation with LLM
+Tests for Question Generator service
 """
-import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
-import json
-
-from app.services.question_generator import QuestionGenerator, GeneratedQuestion
-from app.models.question import QuestionDifficulty
-
-
-class TestQuestionGenerator:
-    """Tests for QuestionGenerator service"""
-
-    @pytest.fixture
-    def mock_llm_client(self):
-        """Create a mock LLM client"""
-        client = AsyncMock()
-        client.generate = AsyncMock()
-        return client
-
-    @pytest.fixture
-    def question_generator(self, mock_llm_client):
-        """Create a QuestionGenerator instance with mocked LLM"""
-        generator = QuestionGenerator(llm_client=mock_llm_client)
-        return generator
-
-    @pytest.fixture
-    def sample_chunk(self):
-        """Sample text chunk for question generation"""
-        return {
-            "text": """
-            Python is a high-level, interpreted programming language known for its 
-            simplicity and readability. It was created by Guido van Rossum and first 
-            released in 1991. Python supports multiple programming paradigms including 
-            procedural, object-oriented, and functional programming.
-            """,
-            "chunk_id": "chunk-001",
-            "page_numbers": [1, 2],
-        }
-
-    @pytest.mark.asyncio
-    async def test_generate_question_success(self, question_generator, mock_llm_client, sample_chunk):
-        """Test successful question generation"""
-        mock_response = json.dumps({
-            "question": "Who created the Python programming language?",
-            "options": {
-                "A": "Guido van Rossum",
-                "B": "Dennis Ritchie",
-                "C": "James Gosling",
-                "D": "Bjarne Stroustrup"
-            },
-            "correct_option": "A",
-            "explanation": "Python was created by Guido van Rossum and first released in 1991.",
-            "difficulty": "easy"
-        })
-        mock_llm_client.generate.return_value = mock_response
-
-        questions = await question_generator.generate_questions(
-            chunk=sample_chunk,
-            count=1,
-            difficulty="easy"
-        )
-
-        assert len(questions) == 1
-        assert questions[0].question == "Who created the Python programming language?"
-        assert questions[0].correct_option == "A"
-
-    @pytest.mark.asyncio
-    async def test_generate_multiple_questions(self, question_generator, mock_llm_client, sample_chunk):
-        """Test generating multiple questions from a chunk"""
-        responses = [
-            json.dumps({
-                "question": f"Question {i}?",
-                "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-                "correct_option": "A",
-                "explanation": f"Explanation {i}",
-                "difficulty": "medium"
-            }) for i in range(3)
-        ]
-        mock_llm_client.generate.side_effect = responses
-
-        questions = await question_generator.generate_questions(
-            chunk=sample_chunk,
-            count=3,
-            difficulty="medium"
-        )
+import asyncio
 
-        assert len(questions) == 3
+import pytest
+from unittest.mock import MagicMock
 
-    @pytest.mark.asyncio
-    async def test_generate_questions_with_difficulty_filter(self, question_generator, mock_llm_client, sample_chunk):
-        """Test generating questions filtered by difficulty"""
-        mock_response = json.dumps({
-            "question": "What is a closure in Python?",
-            "options": {
-                "A": "A function that returns another function",
-                "B": "A class method",
-                "C": "A loop construct",
-                "D": "A data type"
-            },
-            "correct_option": "A",
-            "explanation": "A closure is a function object that has access to variables in its enclosing scope.",
-            "difficulty": "hard"
-        })
-        mock_llm_client.generate.return_value = mock_response
+from app.config import settings
+from app.services.question_generator import QuestionGenerator
+from app.services.text_chunker import TextChunker
+from app.models.question import DifficultyLevel, QuestionGenerationRequest
+from app.utils.cache import RedisCache
+from app.utils.errors import JSONParseError, LLMTimeoutError
 
-        questions = await question_generator.generate_questions(
-            chunk=sample_chunk,
-            count=1,
-            difficulty="hard"
-        )
 
-        assert questions[0].difficulty == QuestionDifficulty.HARD
+PYTHON_TEXT = """
+Python is a high-level, interpreted programming language known for its
+simplicity and readability. It was created by Guido van Rossum and first
+released in 1991. Python supports multiple programming paradigms including
+procedural, object-oriented, and functional programming.
+"""
 
-    @pytest.mark.asyncio
-    async def test_handle_malformed_llm_response(self, question_generator, mock_llm_client, sample_chunk):
-        """Test handling of malformed LLM responses"""
-        mock_llm_client.generate.return_value = "This is not valid JSON"
 
-        with pytest.raises(ValueError, match="Failed to parse"):
-            await question_generator.generate_questions(
-                chunk=sample_chunk,
-                count=1
-            )
+def question(text, options, correct="A", explanation=None, difficulty="easy"):
+    """Build an LLM question payload."""
+    correct_text = options[ord(correct) - ord("A")]
+    return {
+        "questionText": text,
+        "options": [{"id": k, "text": v} for k, v in zip("ABCD", options)],
+        "correctAnswer": correct,
+        "explanation": explanation or f"The text states that {correct_text} is the answer.",
+        "difficulty": difficulty,
+    }
+
+
+def llm_reply(*questions):
+    """Wrap question payloads the way OllamaClient.generate_questions returns them."""
+    return {"response": {"questions": list(questions)}}
+
+
+CREATOR_Q = question(
+    "Who created the Python programming language?",
+    ["Guido van Rossum", "Dennis Ritchie", "James Gosling", "Bjarne Stroustrup"],
+)
+RELEASE_Q = question(
+    "In which year was Python first released?",
+    ["1989", "1991", "1995", "2000"],
+    correct="B",
+    explanation="Python was first released in 1991 by its creator.",
+)
+PARADIGM_Q = question(
+    "Which programming paradigms does Python support?",
+    ["Only procedural", "Procedural, object-oriented and functional", "Only functional", "Only logic"],
+    correct="B",
+    explanation="Python supports procedural, object-oriented and functional programming.",
+)
+
+
+@pytest.fixture
+def memory_cache():
+    """RedisCache backed by an in-memory dict instead of a Redis server."""
+    store: dict[str, str] = {}
+    
+    cache = RedisCache()
+    cache._client = MagicMock()
+    cache._client.get.side_effect = store.get
+    cache._client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    cache.store = store
+    return cache
+
+
+@pytest.fixture
+def make_generator(generator, make_llm, memory_cache, monkeypatch):
+    """Point the shared generator at a stub LLM replaying ``responses``."""
+    def _make(responses, chunker=None):
+        llm = make_llm(responses)
+        monkeypatch.setattr(generator, "llm_client", llm)
+        monkeypatch.setattr(generator, "cache", memory_cache)
+        if chunker is not None:
+            monkeypatch.setattr(generator, "chunker", chunker)
+        return generator, llm
+    
+    return _make
+
+
+def request(text=PYTHON_TEXT, **kwargs):
+    """Build a generation request with test defaults."""
+    kwargs.setdefault("difficulty", DifficultyLevel.EASY)
+    kwargs.setdefault("count", 1)
+    return QuestionGenerationRequest(text=text, **kwargs)
 
-    @pytest.mark.asyncio
-    async def test_handle_incomplete_llm_response(self, question_generator, mock_llm_client, sample_chunk):
-        """Test handling of incomplete LLM responses (missing fields)"""
-        mock_response = json.dumps({
-            "question": "Incomplete question?",
-            # Missing options, correct_option, explanation
-        })
-        mock_llm_client.generate.return_value = mock_response
 
-        with pytest.raises(ValueError, match="Missing required field"):
-            await question_generator.generate_questions(
-                chunk=sample_chunk,
-                count=1
+class TestQuestionGenerator:
+    """Tests for QuestionGenerator class."""
+    
+    async def test_generate_question_success(self, make_generator):
+        """Test successful question generation."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        
+        result = await generator.generate(request())
+        
+        assert len(result.questions) == 1
+        assert result.questions[0].question_text == CREATOR_Q["questionText"]
+        assert result.questions[0].correct_answer == "A"
+        assert llm.call_count == 1
+    
+    async def test_generate_multiple_questions(self, make_generator):
+        """Test generating multiple questions from one chunk."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q, RELEASE_Q, PARADIGM_Q)])
+        
+        result = await generator.generate(request(count=3))
+        
+        assert len(result.questions) == 3
+        assert result.total_generated == 3
+        assert llm.call_count == 1
+    
+    async def test_generate_questions_with_difficulty(self, make_generator):
+        """Test requested difficulty is applied to generated questions."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        
+        result = await generator.generate(request(difficulty=DifficultyLevel.HARD))
+        
+        assert result.questions[0].difficulty == DifficultyLevel.HARD
+    
+    async def test_handle_malformed_llm_response(self, make_generator):
+        """Test unparseable LLM output yields no questions instead of raising."""
+        generator, llm = make_generator([JSONParseError(response="not json", parse_error="bad")])
+        
+        result = await generator.generate(request())
+        
+        assert result.questions == []
+        assert result.total_generated == 0
+    
+    async def test_handle_incomplete_llm_response(self, make_generator):
+        """Test questions missing required fields are rejected."""
+        generator, llm = make_generator([llm_reply({"questionText": "Incomplete question?"})])
+        
+        result = await generator.generate(request())
+        
+        assert result.questions == []
+        assert result.total_generated == 1
+    
+    async def test_llm_timeout_yields_no_questions(self, make_generator):
+        """Test an LLM timeout is contained to its chunk."""
+        generator, llm = make_generator([LLMTimeoutError(timeout=30, attempt=4)])
+        
+        result = await generator.generate(request())
+        
+        assert result.questions == []
+        assert llm.call_count == 1
+    
+    async def test_generate_per_chunk(self, make_generator, long_sample_text):
+        """Test each chunk of a long text gets its own LLM call."""
+        chunker = TextChunker(chunk_size_words=50, overlap_words=10)
+        generator, llm = make_generator([llm_reply(CREATOR_Q)], chunker=chunker)
+        
+        result = await generator.generate(request(text=long_sample_text, count=10, use_cache=False))
+        
+        assert result.chunk_count > 1
+        assert llm.call_count == result.chunk_count
+    
+    async def test_llm_concurrency_shared_across_requests(self, validator, memory_cache, long_sample_text):
+        """Test concurrent requests together stay within the LLM concurrency limit."""
+        in_flight = peak = 0
+        
+        class SlowLLM:
+            async def generate_questions(self, *args, **kwargs):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return llm_reply(CREATOR_Q)
+        
+        # One generator per request, as the router builds them
+        generators = [
+            QuestionGenerator(
+                chunker=TextChunker(chunk_size_words=50, overlap_words=10),
+                llm_client=SlowLLM(),
+                validator=validator,
+                cache=memory_cache,
             )
-
-    @pytest.mark.asyncio
-    async def test_retry_on_llm_timeout(self, question_generator, mock_llm_client, sample_chunk):
-        """Test retry logic when LLM times out"""
-        mock_llm_client.generate.side_effect = [
-            TimeoutError("LLM timeout"),
-            TimeoutError("LLM timeout"),
-            json.dumps({
-                "question": "Success after retry?",
-                "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-                "correct_option": "A",
-                "explanation": "Success",
-                "difficulty": "easy"
-            })
+            for _ in range(3)
         ]
-
-        questions = await question_generator.generate_questions(
-            chunk=sample_chunk,
-            count=1,
-            max_retries=3
-        )
-
-        assert len(questions) == 1
-        assert mock_llm_client.generate.call_count == 3
-
-    @pytest.mark.asyncio
-    async def test_fail_after_max_retries(self, question_generator, mock_llm_client, sample_chunk):
-        """Test failure after exhausting max retries"""
-        mock_llm_client.generate.side_effect = TimeoutError("LLM timeout")
-
-        with pytest.raises(TimeoutError):
-            await question_generator.generate_questions(
-                chunk=sample_chunk,
-                count=1,
-                max_retries=3
-            )
-
-        assert mock_llm_client.generate.call_count == 3
-
-    @pytest.mark.asyncio
-    async def test_generate_questions_for_short_chunk(self, question_generator, mock_llm_client):
-        """Test generating questions from a very short chunk"""
-        short_chunk = {
-            "text": "Python is a programming language.",
-            "chunk_id": "short-001",
-            "page_numbers": [1],
-        }
-        
-        mock_response = json.dumps({
-            "question": "What is Python?",
-            "options": {
-                "A": "A programming language",
-                "B": "A snake",
-                "C": "A database",
-                "D": "An operating system"
-            },
-            "correct_option": "A",
-            "explanation": "Python is a programming language.",
-            "difficulty": "easy"
-        })
-        mock_llm_client.generate.return_value = mock_response
-
-        questions = await question_generator.generate_questions(
-            chunk=short_chunk,
-            count=1
-        )
-
-        assert len(questions) == 1
-
-    @pytest.mark.asyncio
-    async def test_generate_questions_with_context(self, question_generator, mock_llm_client, sample_chunk):
-        """Test generating questions with additional context"""
-        mock_response = json.dumps({
-            "question": "In what year was Python released?",
-            "options": {"A": "1989", "B": "1991", "C": "1995", "D": "2000"},
-            "correct_option": "B",
-            "explanation": "Python was first released in 1991.",
-            "difficulty": "medium"
-        })
-        mock_llm_client.generate.return_value = mock_response
-
-        questions = await question_generator.generate_questions(
-            chunk=sample_chunk,
-            count=1,
-            context="Focus on historical facts about Python."
+        
+        await asyncio.gather(*(
+            g.generate(request(text=long_sample_text, count=10, use_cache=False))
+            for g in generators
+        ))
+        
+        assert peak == settings.ollama_max_concurrency
+    
+    async def test_deduplicate_similar_questions(self, make_generator):
+        """Test near-identical questions are dropped."""
+        reworded = {**CREATOR_Q, "questionText": "Who created the Python programming language ?"}
+        generator, llm = make_generator([llm_reply(CREATOR_Q, reworded, RELEASE_Q)])
+        
+        result = await generator.generate(request(count=3))
+        
+        texts = [q.question_text for q in result.questions]
+        assert texts == [CREATOR_Q["questionText"], RELEASE_Q["questionText"]]
+    
+    async def test_deduplicate_keeps_questions_sharing_a_stem(self, make_generator):
+        """Test questions that only share wording with different answers are kept."""
+        mitochondria = question(
+            "What is the function of mitochondria?",
+            ["Energy production", "Protein synthesis", "Lipid storage", "Cell division"],
         )
-
-        # Verify context was included in the prompt
-        call_args = mock_llm_client.generate.call_args
-        assert "historical facts" in str(call_args).lower() or len(questions) == 1
-
-    @pytest.mark.asyncio
-    async def test_deduplicate_similar_questions(self, question_generator, mock_llm_client, sample_chunk):
-        """Test that similar questions are deduplicated"""
-        # This would require the generator to track generated questions
-        responses = [
-            json.dumps({
-                "question": "Who created Python?",
-                "options": {"A": "Guido", "B": "Dennis", "C": "James", "D": "Bjarne"},
-                "correct_option": "A",
-                "explanation": "Guido created Python",
-                "difficulty": "easy"
-            }),
-            json.dumps({
-                "question": "Who is the creator of Python?",  # Similar question
-                "options": {"A": "Guido", "B": "Dennis", "C": "James", "D": "Bjarne"},
-                "correct_option": "A",
-                "explanation": "Guido created Python",
-                "difficulty": "easy"
-            }),
-            json.dumps({
-                "question": "When was Python released?",  # Different question
-                "options": {"A": "1991", "B": "1989", "C": "1995", "D": "2000"},
-                "correct_option": "A",
-                "explanation": "Python was released in 1991",
-                "difficulty": "easy"
-            })
-        ]
-        mock_llm_client.generate.side_effect = responses
-
-        questions = await question_generator.generate_questions(
-            chunk=sample_chunk,
-            count=2,
-            deduplicate=True
+        ribosomes = question(
+            "What is the function of ribosomes?",
+            ["Protein synthesis", "Energy production", "Lipid storage", "Cell division"],
         )
-
-        # Should return 2 unique questions
-        question_texts = [q.question for q in questions]
-        assert len(set(question_texts)) == len(question_texts)
-
-
-class TestQuestionValidation:
-    """Tests for question validation logic"""
-
-    @pytest.fixture
-    def question_generator(self):
-        return QuestionGenerator(llm_client=AsyncMock())
-
-    def test_validate_correct_option_is_valid(self, question_generator):
-        """Test that correct option must be A, B, C, or D"""
-        question_data = {
-            "question": "Test?",
-            "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-            "correct_option": "E",  # Invalid
-            "explanation": "Test",
-            "difficulty": "easy"
-        }
-
-        is_valid = question_generator.validate_question(question_data)
-        assert is_valid is False
-
-    def test_validate_all_options_present(self, question_generator):
-        """Test that all four options must be present"""
-        question_data = {
-            "question": "Test?",
-            "options": {"A": "a", "B": "b", "C": "c"},  # Missing D
-            "correct_option": "A",
-            "explanation": "Test",
-            "difficulty": "easy"
-        }
-
-        is_valid = question_generator.validate_question(question_data)
-        assert is_valid is False
-
-    def test_validate_question_not_empty(self, question_generator):
-        """Test that question text cannot be empty"""
-        question_data = {
-            "question": "",
-            "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-            "correct_option": "A",
-            "explanation": "Test",
-            "difficulty": "easy"
-        }
-
-        is_valid = question_generator.validate_question(question_data)
-        assert is_valid is False
-
-    def test_validate_options_not_identical(self, question_generator):
-        """Test that options should not be identical"""
-        question_data = {
-            "question": "Test?",
-            "options": {"A": "same", "B": "same", "C": "same", "D": "same"},
-            "correct_option": "A",
-            "explanation": "Test",
-            "difficulty": "easy"
-        }
-
-        is_valid = question_generator.validate_question(question_data)
-        assert is_valid is False
-
-    def test_validate_explanation_present(self, question_generator):
-        """Test that explanation must be present"""
-        question_data = {
-            "question": "Test?",
-            "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-            "correct_option": "A",
-            "explanation": "",
-            "difficulty": "easy"
-        }
-
-        is_valid = question_generator.validate_question(question_data)
-        assert is_valid is False
-
-    def test_validate_difficulty_is_valid(self, question_generator):
-        """Test that difficulty must be valid value"""
-        question_data = {
-            "question": "Test?",
-            "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-            "correct_option": "A",
-            "explanation": "Test",
-            "difficulty": "impossible"  # Invalid difficulty
-        }
-
-        is_valid = question_generator.validate_question(question_data)
-        assert is_valid is False
+        python_year = question("In what year was Python first released?", ["1991", "1995", "2000", "1989"])
+        java_year = question("In what year was Java first released?", ["1995", "1991", "2000", "1989"])
+        generator, llm = make_generator([llm_reply(mitochondria, ribosomes, python_year, java_year)])
+        
+        result = await generator.generate(request(count=4))
+        
+        assert len(result.questions) == 4
 
 
 class TestPromptGeneration:
-    """Tests for prompt template generation"""
-
-    @pytest.fixture
-    def question_generator(self):
-        return QuestionGenerator(llm_client=AsyncMock())
-
-    def test_generate_prompt_includes_chunk_text(self, question_generator):
-        """Test that prompt includes the chunk text"""
-        chunk = {"text": "Python is a programming language.", "chunk_id": "1"}
-        prompt = question_generator.build_prompt(chunk, difficulty="easy", count=1)
-
-        assert "Python is a programming language" in prompt
-
-    def test_generate_prompt_includes_difficulty(self, question_generator):
-        """Test that prompt includes difficulty level"""
-        chunk = {"text": "Test content", "chunk_id": "1"}
-        prompt = question_generator.build_prompt(chunk, difficulty="hard", count=1)
-
-        assert "hard" in prompt.lower()
-
-    def test_generate_prompt_includes_count(self, question_generator):
-        """Test that prompt requests correct number of questions"""
-        chunk = {"text": "Test content", "chunk_id": "1"}
-        prompt = question_generator.build_prompt(chunk, difficulty="medium", count=5)
-
-        assert "5" in prompt
-
-    def test_generate_prompt_includes_format_instructions(self, question_generator):
-        """Test that prompt includes JSON format instructions"""
-        chunk = {"text": "Test content", "chunk_id": "1"}
-        prompt = question_generator.build_prompt(chunk, difficulty="easy", count=1)
-
-        assert "json" in prompt.lower()
-        assert "question" in prompt.lower()
-        assert "options" in prompt.lower()
-
-
-class TestQuestionDifficultyDistribution:
-    """Tests for generating questions with specific difficulty distributions"""
-
-    @pytest.fixture
-    def question_generator(self):
-        mock_client = AsyncMock()
-        return QuestionGenerator(llm_client=mock_client)
-
-    @pytest.mark.asyncio
-    async def test_generate_mixed_difficulty_questions(self, question_generator):
-        """Test generating questions with mixed difficulties"""
-        chunk = {"text": "Test content for multiple questions", "chunk_id": "1"}
-        
-        question_generator.llm_client.generate.side_effect = [
-            json.dumps({
-                "question": "Easy question?",
-                "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-                "correct_option": "A",
-                "explanation": "Easy",
-                "difficulty": "easy"
-            }),
-            json.dumps({
-                "question": "Medium question?",
-                "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-                "correct_option": "B",
-                "explanation": "Medium",
-                "difficulty": "medium"
-            }),
-            json.dumps({
-                "question": "Hard question?",
-                "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-                "correct_option": "C",
-                "explanation": "Hard",
-                "difficulty": "hard"
-            })
-        ]
-
-        questions = await question_generator.generate_questions_mixed(
-            chunk=chunk,
-            easy_count=1,
-            medium_count=1,
-            hard_count=1
-        )
-
-        difficulties = [q.difficulty for q in questions]
-        assert QuestionDifficulty.EASY in difficulties
-        assert QuestionDifficulty.MEDIUM in difficulties
-        assert QuestionDifficulty.HARD in difficulties
+    """Tests for the prompts sent to the LLM."""
+    
+    async def test_prompt_includes_chunk_text(self, make_generator):
+        """Test the chunk text is sent to the LLM."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        
+        await generator.generate(request())
+        
+        _, _, kwargs = llm.calls[0]
+        assert "Guido van Rossum" in kwargs["text_chunk"]
+    
+    async def test_prompt_includes_difficulty_and_count(self, make_generator):
+        """Test the user prompt requests the difficulty and question count."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        
+        await generator.generate(request(difficulty=DifficultyLevel.HARD, count=5))
+        
+        _, _, kwargs = llm.calls[0]
+        assert "HARD" in kwargs["user_prompt"]
+        assert "Generate 5" in kwargs["user_prompt"]
+        assert kwargs["count"] == 5
+    
+    async def test_system_prompt_requires_json(self, make_generator):
+        """Test the system prompt asks for JSON output."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        
+        await generator.generate(request())
+        
+        _, _, kwargs = llm.calls[0]
+        assert "json" in kwargs["system_prompt"].lower()
 
 
 class TestCacheIntegration:
-    """Tests for caching generated questions"""
-
-    @pytest.fixture
-    def mock_cache(self):
-        cache = MagicMock()
-        cache.get = AsyncMock(return_value=None)
-        cache.set = AsyncMock()
-        return cache
-
-    @pytest.fixture
-    def question_generator_with_cache(self, mock_cache):
-        generator = QuestionGenerator(
-            llm_client=AsyncMock(),
-            cache=mock_cache
-        )
-        return generator, mock_cache
-
-    @pytest.mark.asyncio
-    async def test_cache_hit_returns_cached_questions(self, question_generator_with_cache):
-        """Test that cached questions are returned on cache hit"""
-        generator, cache = question_generator_with_cache
-        
-        cached_questions = [
-            {
-                "question": "Cached question?",
-                "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-                "correct_option": "A",
-                "explanation": "Cached",
-                "difficulty": "easy"
-            }
-        ]
-        cache.get.return_value = json.dumps(cached_questions)
-
-        chunk = {"text": "Test", "chunk_id": "cached-chunk"}
-        questions = await generator.generate_questions(chunk=chunk, count=1)
-
-        # LLM should not be called on cache hit
-        assert generator.llm_client.generate.call_count == 0
-
-    @pytest.mark.asyncio
-    async def test_cache_miss_calls_llm(self, question_generator_with_cache):
-        """Test that LLM is called on cache miss"""
-        generator, cache = question_generator_with_cache
-        cache.get.return_value = None
-        
-        generator.llm_client.generate.return_value = json.dumps({
-            "question": "New question?",
-            "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
-            "correct_option": "A",
-            "explanation": "New",
-            "difficulty": "easy"
-        })
-
-        chunk = {"text": "Test", "chunk_id": "new-chunk"}
-        await generator.generate_questions(chunk=chunk, count=1)
-
-        assert generator.llm_client.generate.call_count == 1
-        assert cache.set.call_count == 1
+    """Tests for caching generated questions."""
+    
+    async def test_cache_miss_calls_llm_and_stores(self, make_generator, memory_cache):
+        """Test a cache miss calls the LLM and caches the valid questions."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        
+        result = await generator.generate(request())
+        
+        assert llm.call_count == 1
+        assert result.from_cache is False
+        assert len(memory_cache.store) == 1
+    
+    async def test_cache_hit_skips_llm(self, make_generator):
+        """Test cached questions are returned without calling the LLM."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        await generator.generate(request())
+        
+        result = await generator.generate(request())
+        
+        assert llm.call_count == 1
+        assert result.from_cache is True
+        assert result.questions[0].question_text == CREATOR_Q["questionText"]
+    
+    async def test_cache_keyed_on_count(self, make_generator):
+        """Test a different question count misses the cache."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q, RELEASE_Q)])
+        await generator.generate(request(count=1))
+        
+        await generator.generate(request(count=2))
+        
+        assert llm.call_count == 2
+    
+    async def test_cache_disabled(self, make_generator, memory_cache):
+        """Test use_cache=False neither reads nor writes the cache."""
+        generator, llm = make_generator([llm_reply(CREATOR_Q)])
+        
+        await generator.generate(request(use_cache=False))
+        await generator.generate(request(use_cache=False))
+        
+        assert llm.call_count == 2
+        assert memory_cache.store == {}
@@ -1,20 +1,12 @@
 """
 Tests for Question Validator service
 """
-import pytest
-
-from app.services.question_validator import QuestionValidator
 from app.models.question import DifficultyLevel
 
 
 class TestQuestionValidator:
     """Tests for QuestionValidator class."""
     
-    @pytest.fixture
-    def validator(self):
-        """Create a validator instance."""
-        return QuestionValidator()
-    
     def test_init_loads_settings(self, validator):
         """Test validator initializes with settings."""
         assert validator.min_quality_score > 0
@@ -196,6 +188,24 @@ class TestQuestionValidator:
         if question:
             assert question.difficulty == DifficultyLevel.HARD
     
+    def test_validate_difficulty_from_question_data(self, validator, sample_question_data):
+        """Test that difficulty falls back to the question's own value."""
+        data = {**sample_question_data, "difficulty": "hard"}
+        
+        result, question = validator.validate(data)
+        
+        assert question is not None
+        assert question.difficulty == DifficultyLevel.HARD
+    
+    def test_validate_invalid_difficulty(self, validator, sample_question_data):
+        """Test that an unknown difficulty value invalidates the question."""
+        data = {**sample_question_data, "difficulty": "extreme"}
+        
+        result, question = validator.validate(data)
+        
+        assert not result.is_valid
+        assert any("Invalid difficulty" in issue for issue in result.issues)
+    
     def test_batch_validate(self, validator, sample_question_data):
         """Test batch validation of multiple questions."""
         questions = [sample_question_data, sample_question_data]
@@ -205,6 +215,17 @@ class TestQuestionValidator:
         assert len(results) == 2
         assert all(isinstance(r[0].is_valid, bool) for r in results)
     
+    def test_batch_validate_with_source_text(self, validator, sample_question_data, sample_text):
+        """Test batch validation matches per-question validation with a shared source."""
+        results = validator.batch_validate(
+            [sample_question_data, sample_question_data],
+            source_text=sample_text,
+        )
+        single, _ = validator.validate(sample_question_data, source_text=sample_text)
+        
+        assert [r[0].quality_score for r in results] == [single.quality_score] * 2
+        assert all(r[0].metrics["semantic"] == single.metrics["semantic"] for r in results)
+    
     def test_quality_score_range(self, validator, sample_question_data):
         """Test that quality score is within valid range."""
         result, question = validator.validate(sample_question_data)
@@ -223,10 +244,6 @@ class TestQuestionValidator:
 class TestValidationSchemaStage:
     """Tests specifically for schema validation stage."""
     
-    @pytest.fixture
-    def validator(self):
-        return QuestionValidator()
-    
     def test_schema_valid(self, validator, sample_question_data):
         """Test schema validation passes for valid data."""
         is_valid, issues, score = validator._validate_schema(sample_question_data)
@@ -2,20 +2,24 @@
 Tests for FastAPI routers
 """
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
-from fastapi.testclient import TestClient
 from io import BytesIO
+from types import SimpleNamespace
 
-from app.main import app
+from app.routers.health import get_llm_client
+from app.utils.cache import get_cache
+
+
+# Run all API tests on one xdist worker (with --dist loadgroup) so the
+# app lifespan and session TestClient start once
+pytestmark = pytest.mark.xdist_group("api")
+
+# Built once at import rather than inside each test
+LONG_TEXT = "This is a test sentence. " * 100
 
 
 class TestHealthRoutes:
     """Tests for health check endpoints."""
     
-    @pytest.fixture
-    def client(self):
-        return TestClient(app)
-    
     def test_health_check(self, client):
         """Test basic health check endpoint."""
         response = client.get("/health")
@@ -33,29 +37,17 @@ class TestHealthRoutes:
         data = response.json()
         assert data["status"] == "alive"
     
-    def test_readiness_check(self, client):
+    def test_readiness_check(self, client, mock_ollama_client):
         """Test readiness check includes dependencies."""
-        with patch('app.routers.health.get_cache') as mock_cache, \
-             patch('app.routers.health.OllamaClient') as mock_llm:
-            
-            # Mock cache
-            mock_cache_instance = MagicMock()
-            mock_cache_instance.is_connected.return_value = True
-            mock_cache.return_value = mock_cache_instance
-            
-            # Mock LLM client
-            mock_llm_instance = AsyncMock()
-            mock_llm_instance.check_health = AsyncMock(return_value={
-                "healthy": True,
-                "model_available": True,
-            })
-            mock_llm_instance.close = AsyncMock()
-            mock_llm.return_value = mock_llm_instance
-            
-            response = client.get("/health/ready")
+        cache = SimpleNamespace(is_connected=lambda: True)
+        client.app.dependency_overrides[get_cache] = lambda: cache
+        client.app.dependency_overrides[get_llm_client] = lambda: mock_ollama_client
+        
+        response = client.get("/health/ready")
         
         assert response.status_code == 200
         data = response.json()
+        assert data["status"] == "healthy"
         assert "dependencies" in data
         assert "redis" in data["dependencies"]
         assert "ollama" in data["dependencies"]
@@ -64,10 +56,6 @@ class TestHealthRoutes:
 class TestQuestionRoutes:
     """Tests for question generation endpoints."""
     
-    @pytest.fixture
-    def client(self):
-        return TestClient(app)
-    
     def test_list_difficulties(self, client):
         """Test listing available difficulties."""
         response = client.get("/api/v1/questions/difficulties")
@@ -121,10 +109,6 @@ class TestQuestionRoutes:
 class TestPDFRoutes:
     """Tests for PDF processing endpoints."""
     
-    @pytest.fixture
-    def client(self):
-        return TestClient(app)
-    
     def test_extract_pdf_no_file(self, client):
         """Test error when no file provided."""
         response = client.post("/api/v1/pdf/extract")
@@ -142,14 +126,42 @@ class TestPDFRoutes:
         data = response.json()
         assert "INVALID_FILE_TYPE" in str(data)
     
+    def test_extract_pdf_wrong_content_type(self, client):
+        """Test error for a .pdf filename uploaded with a non-PDF content type."""
+        response = client.post(
+            "/api/v1/pdf/extract",
+            files={"file": ("test.pdf", b"%PDF-1.4", "text/plain")},
+        )
+        
+        assert response.status_code == 400
+        assert "INVALID_FILE_TYPE" in str(response.json())
+    
+    def test_extract_pdf_missing_signature(self, client):
+        """Test error for a .pdf upload that does not start like a PDF."""
+        response = client.post(
+            "/api/v1/pdf/extract",
+            files={"file": ("test.pdf", b"not a pdf", "application/pdf")},
+        )
+        
+        assert response.status_code == 400
+        assert "INVALID_FILE_TYPE" in str(response.json())
+    
+    def test_extract_pdf_success(self, client, sample_pdf_bytes):
+        """Test text extraction from an uploaded PDF."""
+        response = client.post(
+            "/api/v1/pdf/extract",
+            files={"file": ("sample.pdf", sample_pdf_bytes, "application/pdf")},
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["metadata"]["pageCount"] > 0
+    
     def test_chunk_text_success(self, client):
         """Test successful text chunking."""
-        long_text = "This is a test sentence. " * 100
-        
         response = client.post(
             "/api/v1/pdf/chunk",
             json={
-                "text": long_text,
+                "text": LONG_TEXT,
                 "chunkSizeWords": 50,
                 "overlapWords": 10,
             }
@@ -171,6 +183,17 @@ class TestPDFRoutes:
         
         assert response.status_code == 422
     
+    def test_chunk_text_malformed_json(self, client):
+        """Test a malformed JSON body is rejected by request validation."""
+        response = client.post(
+            "/api/v1/pdf/chunk",
+            content=b'{"text": "unterminated',
+            headers={"Content-Type": "application/json"},
+        )
+        
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "json_invalid"
+    
     def test_chunk_text_invalid_params(self, client):
         """Test validation for invalid chunking parameters."""
         response = client.post(
@@ -188,10 +211,6 @@ class TestPDFRoutes:
 class TestRootEndpoint:
     """Tests for root endpoint."""
     
-    @pytest.fixture
-    def client(self):
-        return TestClient(app)
-    
     def test_root_returns_info(self, client):
         """Test root endpoint returns service info."""
         response = client.get("/")
@@ -206,10 +225,6 @@ class TestRootEndpoint:
 class TestErrorHandling:
     """Tests for error handling."""
     
-    @pytest.fixture
-    def client(self):
-        return TestClient(app)
-    
     def test_404_not_found(self, client):
         """Test 404 for unknown endpoint."""
         response = client.get("/api/v1/unknown")
@@ -158,18 +158,13 @@ class TestTextChunker:
 class TestTextChunkerWithSpacy:
     """Tests for spaCy integration in chunker."""
     
-    def test_nlp_lazy_loading(self):
-        """Test that spaCy model is loaded lazily."""
-        chunker = TextChunker()
-        
-        # NLP should not be loaded yet
-        assert chunker._nlp is None
-        
-        # Access nlp property triggers loading
-        nlp = chunker.nlp
+    def test_nlp_shared_across_instances(self):
+        """Test that all chunkers share one loaded spaCy pipeline."""
+        nlp = TextChunker().nlp
         
         assert nlp is not None
-        assert chunker._nlp is not None
+        assert "sentencizer" in nlp.pipe_names
+        assert TextChunker(chunk_size_words=200).nlp is nlp
     
     def test_get_sentences(self, sample_text):
         """Test sentence extraction."""
@@ -181,6 +176,31 @@ class TestTextChunkerWithSpacy:
         assert all(isinstance(s, str) for s in sentences)
         assert all(len(s) > 0 for s in sentences)
     
+    def test_get_sentences_regex_split(self):
+        """Test the default splitter breaks after terminal punctuation only."""
+        chunker = TextChunker(use_spacy=False)
+        
+        sentences = chunker._get_sentences('He said "Stop." Then left! Was it 3.5 percent? Yes.')
+        
+        assert sentences == ['He said "Stop."', "Then left!", "Was it 3.5 percent?", "Yes."]
+    
+    def test_get_sentences_with_spacy(self, sample_text):
+        """Test sentence extraction through the spaCy pipeline."""
+        chunker = TextChunker(use_spacy=True)
+        
+        sentences = chunker._get_sentences(sample_text)
+        
+        assert len(sentences) > 1
+        assert all(s == s.strip() and s for s in sentences)
+    
+    def test_get_sentences_with_spacy_splits_paragraphs(self):
+        """Test paragraphs are piped separately and a blank line ends a sentence."""
+        chunker = TextChunker(use_spacy=True)
+        
+        sentences = chunker._get_sentences("Heading\n\nFirst sentence. Second one.\n\n\nLast paragraph.")
+        
+        assert sentences == ["Heading", "First sentence.", "Second one.", "Last paragraph."]
+    
     def test_sentence_boundary_respect(self):
         """Test that chunking respects sentence boundaries."""
         text = "First sentence. Second sentence. Third sentence. Fourth sentence."
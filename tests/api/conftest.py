@@ -1,29 +1,125 @@
-import pytest
-import requests
+import asyncio
+import base64
+import itertools
+import json
 import os
+import tempfile
+import time
+
+import httpx
+import pytest
+from pytest_asyncio import is_async_test
 
 BASE_URL = "http://localhost:3000"
 
-@pytest.fixture(scope="session")
-def api_client():
-    session = requests.Session()
-    session.headers.update({
-        "Accept": "application/json"
-    })
-    return session
+# RAM-backed scratch space for tmp_path/tmp_path_factory, where available
+TMPFS_DIR = "/dev/shm"
+
+def pytest_configure(config):
+    # Point pytest's temp root at tmpfs unless the caller chose one. Set
+    # before xdist spawns workers, so they inherit it too.
+    if "TMPDIR" not in os.environ and os.access(TMPFS_DIR, os.W_OK):
+        os.environ["TMPDIR"] = TMPFS_DIR
+        tempfile.tempdir = None
+
+def pytest_collection_modifyitems(items):
+    # Run every test on the session loop that owns the shared AsyncClient
+    session_loop = pytest.mark.asyncio(scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+# Open file descriptors of this process (Linux only)
+FD_DIR = "/proc/self/fd"
+
+def _open_files():
+    """File-backed descriptors currently open, as {fd: path}."""
+    files = {}
+    for fd in os.listdir(FD_DIR):
+        try:
+            target = os.readlink(os.path.join(FD_DIR, fd))
+        except OSError:
+            continue  # closed since listdir (e.g. the listdir handle itself)
+        # Pooled keep-alive sockets and pipes aren't paths; only files count
+        if target.startswith("/"):
+            files[fd] = target
+    return files
+
+@pytest.fixture(autouse=True)
+def _fd_guard():
+    """Fail a test that leaves a file handle open, e.g. an unclosed upload."""
+    if not os.path.isdir(FD_DIR):
+        yield
+        return
+    
+    before = _open_files()
+    yield
+    leaked = {fd: path for fd, path in _open_files().items() if before.get(fd) != path}
+    assert not leaked, f"leaked file descriptors: {leaked}"
+
+# Tokens persisted across runs in .pytest_cache, as {base_url: token}
+AUTH_TOKEN_CACHE_KEY = "api/auth_token"
+
+# A cached token must stay valid at least this long (seconds) to be reused
+TOKEN_MIN_TTL = 300
+
+def _token_expiring(token):
+    """Whether a JWT's exp claim falls within TOKEN_MIN_TTL (read without verifying it)."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return claims["exp"] < time.time() + TOKEN_MIN_TTL
+    except (IndexError, KeyError, TypeError, ValueError):
+        return True
+
+def _forget_cached_token(config, authorization):
+    tokens = config.cache.get(AUTH_TOKEN_CACHE_KEY, {})
+    # Only drop the token that was rejected, not on deliberately bad ones
+    if BASE_URL in tokens and authorization == f"Bearer {tokens[BASE_URL]}":
+        del tokens[BASE_URL]
+        config.cache.set(AUTH_TOKEN_CACHE_KEY, tokens)
 
 @pytest.fixture(scope="session")
-def base_url():
-    return BASE_URL
+async def api_client(pytestconfig):
+    """One pooled keep-alive async client for the whole session, rooted at BASE_URL."""
+    async def drop_stale_token(response):
+        # A 401 on an authenticated request means the cached token is no good
+        authorization = response.request.headers.get("Authorization")
+        if response.status_code == 401 and authorization:
+            _forget_cached_token(pytestconfig, authorization)
+    
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={"Accept": "application/json"},
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=16),
+        event_hooks={"response": [drop_stale_token]},
+    ) as client:
+        yield client
 
 @pytest.fixture(scope="session")
-def auth_token(api_client, base_url):
+async def auth_token(api_client, pytestconfig):
+    """Return a token for a test user, reusing the one cached by the last run."""
+    token = pytestconfig.cache.get(AUTH_TOKEN_CACHE_KEY, {}).get(BASE_URL)
+    # Access tokens are short-lived; don't probe with one that's about to lapse
+    if token and not _token_expiring(token):
+        probe = await api_client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+        if probe.status_code == 200:
+            return token
+    
+    token = await _register_and_login(api_client)
+    tokens = pytestconfig.cache.get(AUTH_TOKEN_CACHE_KEY, {})
+    tokens[BASE_URL] = token
+    pytestconfig.cache.set(AUTH_TOKEN_CACHE_KEY, tokens)
+    return token
+
+async def _register_and_login(api_client):
     """Register/Login a test user and return the token."""
     email = f"api-test-{os.urandom(4).hex()}@example.com"
     password = "Password123!"
     
     # Register
-    reg_response = api_client.post(f"{base_url}/api/v1/auth/register", json={
+    reg_response = await api_client.post("/api/v1/auth/register", json={
         "email": email,
         "password": password,
         "fullName": "API Test User"
@@ -31,7 +127,7 @@ def auth_token(api_client, base_url):
     
     # If already exists (unlikely with random), login
     if reg_response.status_code == 400:
-       login_response = api_client.post(f"{base_url}/api/v1/auth/login", json={
+       login_response = await api_client.post("/api/v1/auth/login", json={
            "email": email,
            "password": password
        })
@@ -40,7 +136,7 @@ def auth_token(api_client, base_url):
        # Assuming register returns token or we login after
        # Check response structure. Usually auto-login or explicit login needed.
        # Let's try explicit login to be proper.
-       login_response = api_client.post(f"{base_url}/api/v1/auth/login", json={
+       login_response = await api_client.post("/api/v1/auth/login", json={
            "email": email,
            "password": password
        })
@@ -48,6 +144,39 @@ def auth_token(api_client, base_url):
        
     return token
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def auth_headers(auth_token):
     return {"Authorization": f"Bearer {auth_token}"}
+
+# Just over the server's 10MB upload limit
+OVERSIZED_PDF_BYTES = 10 * 1024 * 1024 + 512 * 1024  # 10.5 MB
+
+@pytest.fixture(scope="session")
+def oversized_pdf_path(tmp_path_factory):
+    """A sparse file just over the 10MB upload limit, created once per session."""
+    path = tmp_path_factory.mktemp("big") / "large.pdf"
+    # Extending with truncate allocates no blocks and writes no data
+    with open(path, "wb") as f:
+        f.truncate(OVERSIZED_PDF_BYTES)
+    return path
+
+@pytest.fixture
+def wait_for_pdf(api_client, auth_headers):
+    """Wait for a PDF to leave the pending/processing states and return its status data."""
+    async def wait(pdf_id, timeout=30.0, max_interval=1.0):
+        deadline = time.monotonic() + timeout
+        data, etag = None, None
+        for attempt in itertools.count():
+            # /status carries just the processing fields, not the whole PDF record;
+            # once we hold an ETag, an unchanged record comes back as a bodyless 304
+            headers = auth_headers if etag is None else {**auth_headers, "If-None-Match": etag}
+            res = await api_client.get(f"/api/v1/pdfs/{pdf_id}/status", headers=headers)
+            if res.status_code != 304:
+                data = res.json()["data"]
+                etag = res.headers.get("ETag")
+            if data["status"] not in ("pending", "processing") or time.monotonic() >= deadline:
+                return data
+            # Back off 0.1s, 0.2s, 0.4s, ... up to max_interval
+            await asyncio.sleep(min(max_interval, 0.1 * 2 ** attempt))
+    
+    return wait
@@ -1,51 +1,43 @@
-import os
+import io
+import uuid
 
-def test_upload_pdf(api_client, base_url, auth_headers):
-    # Create a dummy PDF
-    filename = "api-test.pdf"
-    with open(filename, "wb") as f:
-        f.write(b"%PDF-1.4 empty pdf content")
-        
-    try:
-        files = {'file': (filename, open(filename, 'rb'), 'application/pdf')}
-        response = api_client.post(
-            f"{base_url}/api/v1/pdfs",
-            headers=auth_headers,
-            files=files
-        )
-        assert response.status_code == 201
-        data = response.json()["data"]
-        assert data["filename"] == filename
-        # Ensure we don't have the regression where it was nested
-        assert "pdf" not in data or ("id" in data) # Flattened structure check
-    finally:
-        if os.path.exists(filename):
-            os.remove(filename)
+DUMMY_PDF_BYTES = b"%PDF-1.4 empty pdf content"
+TEXT_FILE_BYTES = b"text content"
 
-def test_get_pdfs_list(api_client, base_url, auth_headers):
-    response = api_client.get(
-        f"{base_url}/api/v1/pdfs",
+# Required top-level fields of a PDF record and of the list response
+PDF_FIELDS = frozenset({"id", "filename", "status", "fileSizeBytes"})
+PDF_LIST_FIELDS = frozenset({"pdfs", "total", "limit", "offset", "hasMore"})
+
+async def test_upload_pdf(api_client, auth_headers):
+    files = {'file': (f"api-test-{uuid.uuid4().hex}.pdf", io.BytesIO(DUMMY_PDF_BYTES), 'application/pdf')}
+    response = await api_client.post(
+        "/api/v1/pdfs",
+        headers=auth_headers,
+        files=files
+    )
+    assert response.status_code == 201
+    data = response.json()["data"]
+    # Flattened record, not nested under "pdf"
+    assert PDF_FIELDS <= data.keys()
+    assert data["filename"].endswith(".pdf")
+
+async def test_get_pdfs_list(api_client, auth_headers):
+    response = await api_client.get(
+        "/api/v1/pdfs",
         headers=auth_headers
     )
     assert response.status_code == 200
     data = response.json()["data"]
-    assert "pdfs" in data
+    assert PDF_LIST_FIELDS <= data.keys()
     assert isinstance(data["pdfs"], list)
+    assert all(PDF_FIELDS <= pdf.keys() for pdf in data["pdfs"])
 
-def test_upload_invalid_file_type(api_client, base_url, auth_headers):
-    filename = "test.txt"
-    with open(filename, "w") as f:
-        f.write("text content")
-        
-    try:
-        files = {'file': (filename, open(filename, 'rb'), 'text/plain')}
-        response = api_client.post(
-            f"{base_url}/api/v1/pdfs",
-            headers=auth_headers,
-            files=files
-        )
-        # 400 Bad Request
-        assert response.status_code == 400
-    finally:
-         if os.path.exists(filename):
-            os.remove(filename)
+async def test_upload_invalid_file_type(api_client, auth_headers):
+    files = {'file': (f"api-test-{uuid.uuid4().hex}.txt", io.BytesIO(TEXT_FILE_BYTES), 'text/plain')}
+    response = await api_client.post(
+        "/api/v1/pdfs",
+        headers=auth_headers,
+        files=files
+    )
+    # 400 Bad Request
+    assert response.status_code == 400